@@ -1,7 +1,8 @@
+import os
 import dash_bootstrap_components as dbc
 from dash import Dash
-from flask_caching import Cache
 import warnings
+from my_project.shared_cache import NamespacedCache, remove_other_versions
 
 # todo remove ignore warnings
 warnings.filterwarnings("ignore")
@@ -11,14 +12,39 @@ app = Dash(
     external_stylesheets=[dbc.themes.BOOTSTRAP],
     suppress_callback_exceptions=True,
 )
-cache = Cache(
+TIMEOUT = 600
+# bump when the callbacks or the charts change, the values cached on disk by
+# the previous versions would otherwise be served for up to a day
+CACHE_VERSION = 1
+CACHE_DIR = f"cache-directory/callbacks/v{CACHE_VERSION}"
+remove_other_versions(CACHE_DIR)
+cache = NamespacedCache(
     app.server,
     config={
-        "CACHE_TYPE": "flask_caching.backends.SimpleCache",
-        "CACHE_DIR": "cache-directory",
+        # shared by the gunicorn workers, any flask_caching backend can be set,
+        # e.g. flask_caching.backends.RedisCache with CACHE_REDIS_URL
+        "CACHE_TYPE": os.environ.get(
+            "CACHE_TYPE", "my_project.shared_cache.SharedFileSystemCache"
+        ),
+        "CACHE_DIR": CACHE_DIR,
+        # for the backends not using CACHE_DIR, e.g. Redis
+        "CACHE_KEY_PREFIX": f"v{CACHE_VERSION}:",
+        "CACHE_REDIS_URL": os.environ.get("CACHE_REDIS_URL"),
+        "CACHE_DEFAULT_TIMEOUT": TIMEOUT,
+        "CACHE_MAX_SIZE_MB": 1024,
+        # seconds the results of the callbacks of a module are kept for, the
+        # charts of a whole dataset are the same for all the users of a station
+        "CACHE_NAMESPACE_TIMEOUTS": {
+            "my_project.tab_summary": 24 * 3600,
+            "my_project.tab_t_rh": 24 * 3600,
+            "my_project.tab_sun": 24 * 3600,
+            "my_project.tab_wind": 24 * 3600,
+            "my_project.tab_outdoor_comfort": 24 * 3600,
+            # figure_cache.FIGURE_NAMESPACE
+            "figure:": 24 * 3600,
+        },
     },
 )
-TIMEOUT = 600
 app.config.suppress_callback_exceptions = True
 
 app.index_string = """<!DOCTYPE html>
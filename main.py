@@ -2,6 +2,7 @@ import dash_bootstrap_components as dbc
 from dash import html, dcc
 from dash.dependencies import Input, Output
 import dash
+from flask import jsonify
 
 from my_project.layout import banner, build_tabs, footer
 from my_project.tab_wind.app_wind import layout_wind
@@ -17,10 +18,18 @@ from my_project.tab_natural_ventilation.app_natural_ventilation import (
 from my_project.tab_summary.app_summary import layout_summary
 from my_project.page_changelog.app_changelog import changelog
 
-from app import app
+from app import app, cache
 
 server = app.server
 
+
+@server.route("/api/cache-stats")
+def cache_stats():
+    """Return the statistics of the cache of the callbacks, if it has any"""
+    stats = getattr(cache.cache, "stats", None)
+    return jsonify(stats() if stats else {})
+
+
 app.title = "CBE Clima Tool"
 app.layout = dbc.Container(
     fluid=True,
@@ -0,0 +1,85 @@
+"""Build assets/data/koppen_geiger.npz from the map bundled with kgcpy.
+
+This is an offline tool, the app only reads the grid it builds. It needs
+kgcpy and Pillow, which are not dependencies of the app, install them with
+`pipenv run pip install kgcpy pillow` before running
+`pipenv run python -m my_project.build_koppen_geiger`.
+"""
+
+import argparse
+from importlib import resources
+
+import numpy as np
+from PIL import Image
+from my_project.koppen_geiger import GRID_PATH, zone_descriptions
+from my_project.utils import code_timer
+
+# zones of the map of kgcpy, numbered from 1 in this order, 32 is the sea
+kgcpy_zones = [
+    "Af",
+    "Am",
+    "As",
+    "Aw",
+    "BSh",
+    "BSk",
+    "BWh",
+    "BWk",
+    "Cfa",
+    "Cfb",
+    "Cfc",
+    "Csa",
+    "Csb",
+    "Csc",
+    "Cwa",
+    "Cwb",
+    "Cwc",
+    "Dfa",
+    "Dfb",
+    "Dfc",
+    "Dfd",
+    "Dsa",
+    "Dsb",
+    "Dsc",
+    "Dsd",
+    "Dwa",
+    "Dwb",
+    "Dwc",
+    "Dwd",
+    "EF",
+    "ET",
+]
+
+
+@code_timer
+def build_koppen_geiger_grid(step=3):
+    """Save the Köppen–Geiger zones of kgcpy as a compressed NumPy grid.
+
+    kgcpy bundles the 1986-2010 map of Rubel et al. (2017) with cells of 100
+    arc seconds, the centre of each block of step x step cells is kept. The
+    zones are saved as the index in "codes", 0 is the sea.
+    """
+    Image.MAX_IMAGE_PIXELS = None
+    with resources.path("kgcpy", "kmz_int_reshape.png") as path:
+        zones = np.asarray(Image.open(path))[step // 2 :: step, step // 2 :: step]
+
+    codes = [""] + kgcpy_zones
+    assert set(kgcpy_zones) == set(zone_descriptions)
+    zones = np.where(zones > len(kgcpy_zones), 0, zones).astype(np.uint8)
+    np.savez_compressed(GRID_PATH, zones=zones, codes=np.array(codes))
+    print(f"{zones.shape[1]} x {zones.shape[0]} cells in {GRID_PATH}")
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(
+        description="Build the Köppen–Geiger grid used for the climate zones."
+    )
+    parser.add_argument(
+        "--step",
+        type=int,
+        default=3,
+        help="keep one cell every step cells of the kgcpy map",
+    )
+    args = parser.parse_args()
+
+    build_koppen_geiger_grid(step=args.step)
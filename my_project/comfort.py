@@ -0,0 +1,478 @@
+import numpy as np
+
+# Terms of the UTCI regression polynomial (Bröde et al., 2012) as
+# (coefficient, tdb exponent, v exponent, delta_t_tr exponent, pa exponent),
+# same coefficients used by pythermalcomfort.models.utci
+UTCI_POLYNOMIAL = (
+    (0.9772287657, 1, 0, 0, 0),
+    (0.607562052, 0, 0, 0, 0),
+    (0.000806470249, 2, 0, 0, 0),
+    (-0.000154271372, 3, 0, 0, 0),
+    (-3.24651735e-06, 4, 0, 0, 0),
+    (7.32602852e-08, 5, 0, 0, 0),
+    (1.35959073e-09, 6, 0, 0, 0),
+    (-2.2583652, 0, 1, 0, 0),
+    (0.0880326035, 1, 1, 0, 0),
+    (0.00216844454, 2, 1, 0, 0),
+    (-1.53347087e-05, 3, 1, 0, 0),
+    (-5.72983704e-07, 4, 1, 0, 0),
+    (-2.55090145e-09, 5, 1, 0, 0),
+    (-0.751269505, 0, 2, 0, 0),
+    (-0.00408350271, 1, 2, 0, 0),
+    (-5.21670675e-05, 2, 2, 0, 0),
+    (1.94544667e-06, 3, 2, 0, 0),
+    (1.14099531e-08, 4, 2, 0, 0),
+    (0.158137256, 0, 3, 0, 0),
+    (-6.57263143e-05, 1, 3, 0, 0),
+    (2.22697524e-07, 2, 3, 0, 0),
+    (-4.16117031e-08, 3, 3, 0, 0),
+    (-0.0127762753, 0, 4, 0, 0),
+    (9.66891875e-06, 1, 4, 0, 0),
+    (2.52785852e-09, 2, 4, 0, 0),
+    (0.000456306672, 0, 5, 0, 0),
+    (-1.74202546e-07, 1, 5, 0, 0),
+    (-5.91491269e-06, 0, 6, 0, 0),
+    (0.398374029, 0, 0, 1, 0),
+    (0.000183945314, 1, 0, 1, 0),
+    (-0.00017375451, 2, 0, 1, 0),
+    (-7.60781159e-07, 3, 0, 1, 0),
+    (3.77830287e-08, 4, 0, 1, 0),
+    (5.43079673e-10, 5, 0, 1, 0),
+    (-0.0200518269, 0, 1, 1, 0),
+    (0.000892859837, 1, 1, 1, 0),
+    (3.45433048e-06, 2, 1, 1, 0),
+    (-3.77925774e-07, 3, 1, 1, 0),
+    (-1.69699377e-09, 4, 1, 1, 0),
+    (0.000169992415, 0, 2, 1, 0),
+    (-4.99204314e-05, 1, 2, 1, 0),
+    (2.47417178e-07, 2, 2, 1, 0),
+    (1.07596466e-08, 3, 2, 1, 0),
+    (8.49242932e-05, 0, 3, 1, 0),
+    (1.35191328e-06, 1, 3, 1, 0),
+    (-6.21531254e-09, 2, 3, 1, 0),
+    (-4.99410301e-06, 0, 4, 1, 0),
+    (-1.89489258e-08, 1, 4, 1, 0),
+    (8.15300114e-08, 0, 5, 1, 0),
+    (0.00075504309, 0, 0, 2, 0),
+    (-5.65095215e-05, 1, 0, 2, 0),
+    (-4.52166564e-07, 2, 0, 2, 0),
+    (2.46688878e-08, 3, 0, 2, 0),
+    (2.42674348e-10, 4, 0, 2, 0),
+    (0.00015454725, 0, 1, 2, 0),
+    (5.2411097e-06, 1, 1, 2, 0),
+    (-8.75874982e-08, 2, 1, 2, 0),
+    (-1.50743064e-09, 3, 1, 2, 0),
+    (-1.56236307e-05, 0, 2, 2, 0),
+    (-1.33895614e-07, 1, 2, 2, 0),
+    (2.49709824e-09, 2, 2, 2, 0),
+    (6.51711721e-07, 0, 3, 2, 0),
+    (1.94960053e-09, 1, 3, 2, 0),
+    (-1.00361113e-08, 0, 4, 2, 0),
+    (-1.21206673e-05, 0, 0, 3, 0),
+    (-2.1820366e-07, 1, 0, 3, 0),
+    (7.51269482e-09, 2, 0, 3, 0),
+    (9.79063848e-11, 3, 0, 3, 0),
+    (1.25006734e-06, 0, 1, 3, 0),
+    (-1.81584736e-09, 1, 1, 3, 0),
+    (-3.52197671e-10, 2, 1, 3, 0),
+    (-3.3651463e-08, 0, 2, 3, 0),
+    (1.35908359e-10, 1, 2, 3, 0),
+    (4.1703262e-10, 0, 3, 3, 0),
+    (-1.30369025e-09, 0, 0, 4, 0),
+    (4.13908461e-10, 1, 0, 4, 0),
+    (9.22652254e-12, 2, 0, 4, 0),
+    (-5.08220384e-09, 0, 1, 4, 0),
+    (-2.24730961e-11, 1, 1, 4, 0),
+    (1.17139133e-10, 0, 2, 4, 0),
+    (6.62154879e-10, 0, 0, 5, 0),
+    (4.0386326e-13, 1, 0, 5, 0),
+    (1.95087203e-12, 0, 1, 5, 0),
+    (-4.73602469e-12, 0, 0, 6, 0),
+    (5.12733497, 0, 0, 0, 1),
+    (-0.312788561, 1, 0, 0, 1),
+    (-0.0196701861, 2, 0, 0, 1),
+    (0.00099969087, 3, 0, 0, 1),
+    (9.51738512e-06, 4, 0, 0, 1),
+    (-4.66426341e-07, 5, 0, 0, 1),
+    (0.548050612, 0, 1, 0, 1),
+    (-0.00330552823, 1, 1, 0, 1),
+    (-0.0016411944, 2, 1, 0, 1),
+    (-5.16670694e-06, 3, 1, 0, 1),
+    (9.52692432e-07, 4, 1, 0, 1),
+    (-0.0429223622, 0, 2, 0, 1),
+    (0.00500845667, 1, 2, 0, 1),
+    (1.00601257e-06, 2, 2, 0, 1),
+    (-1.81748644e-06, 3, 2, 0, 1),
+    (-0.00125813502, 0, 3, 0, 1),
+    (-0.000179330391, 1, 3, 0, 1),
+    (2.34994441e-06, 2, 3, 0, 1),
+    (0.000129735808, 0, 4, 0, 1),
+    (1.2906487e-06, 1, 4, 0, 1),
+    (-2.28558686e-06, 0, 5, 0, 1),
+    (-0.0369476348, 0, 0, 1, 1),
+    (0.00162325322, 1, 0, 1, 1),
+    (-3.1427968e-05, 2, 0, 1, 1),
+    (2.59835559e-06, 3, 0, 1, 1),
+    (-4.77136523e-08, 4, 0, 1, 1),
+    (0.0086420339, 0, 1, 1, 1),
+    (-0.000687405181, 1, 1, 1, 1),
+    (-9.13863872e-06, 2, 1, 1, 1),
+    (5.15916806e-07, 3, 1, 1, 1),
+    (-3.59217476e-05, 0, 2, 1, 1),
+    (3.28696511e-05, 1, 2, 1, 1),
+    (-7.10542454e-07, 2, 2, 1, 1),
+    (-1.243823e-05, 0, 3, 1, 1),
+    (-7.385844e-09, 1, 3, 1, 1),
+    (2.20609296e-07, 0, 4, 1, 1),
+    (-0.00073246918, 0, 0, 2, 1),
+    (-1.87381964e-05, 1, 0, 2, 1),
+    (4.80925239e-06, 2, 0, 2, 1),
+    (-8.7549204e-08, 3, 0, 2, 1),
+    (2.7786293e-05, 0, 1, 2, 1),
+    (-5.06004592e-06, 1, 1, 2, 1),
+    (1.14325367e-07, 2, 1, 2, 1),
+    (2.53016723e-06, 0, 2, 2, 1),
+    (-1.72857035e-08, 1, 2, 2, 1),
+    (-3.95079398e-08, 0, 3, 2, 1),
+    (-3.59413173e-07, 0, 0, 3, 1),
+    (7.04388046e-07, 1, 0, 3, 1),
+    (-1.89309167e-08, 2, 0, 3, 1),
+    (-4.79768731e-07, 0, 1, 3, 1),
+    (7.96079978e-09, 1, 1, 3, 1),
+    (1.62897058e-09, 0, 2, 3, 1),
+    (3.94367674e-08, 0, 0, 4, 1),
+    (-1.18566247e-09, 1, 0, 4, 1),
+    (3.34678041e-10, 0, 1, 4, 1),
+    (-1.15606447e-10, 0, 0, 5, 1),
+    (-2.80626406, 0, 0, 0, 2),
+    (0.548712484, 1, 0, 0, 2),
+    (-0.0039942841, 2, 0, 0, 2),
+    (-0.000954009191, 3, 0, 0, 2),
+    (1.93090978e-05, 4, 0, 0, 2),
+    (-0.308806365, 0, 1, 0, 2),
+    (0.0116952364, 1, 1, 0, 2),
+    (0.000495271903, 2, 1, 0, 2),
+    (-1.90710882e-05, 3, 1, 0, 2),
+    (0.00210787756, 0, 2, 0, 2),
+    (-0.000698445738, 1, 2, 0, 2),
+    (2.30109073e-05, 2, 2, 0, 2),
+    (0.00041785659, 0, 3, 0, 2),
+    (-1.27043871e-05, 1, 3, 0, 2),
+    (-3.04620472e-06, 0, 4, 0, 2),
+    (0.0514507424, 0, 0, 1, 2),
+    (-0.00432510997, 1, 0, 1, 2),
+    (8.99281156e-05, 2, 0, 1, 2),
+    (-7.14663943e-07, 3, 0, 1, 2),
+    (-0.000266016305, 0, 1, 1, 2),
+    (0.000263789586, 1, 1, 1, 2),
+    (-7.01199003e-06, 2, 1, 1, 2),
+    (-0.000106823306, 0, 2, 1, 2),
+    (3.61341136e-06, 1, 2, 1, 2),
+    (2.29748967e-07, 0, 3, 1, 2),
+    (0.000304788893, 0, 0, 2, 2),
+    (-6.42070836e-05, 1, 0, 2, 2),
+    (1.16257971e-06, 2, 0, 2, 2),
+    (7.68023384e-06, 0, 1, 2, 2),
+    (-5.47446896e-07, 1, 1, 2, 2),
+    (-3.5993791e-08, 0, 2, 2, 2),
+    (-4.36497725e-06, 0, 0, 3, 2),
+    (1.68737969e-07, 1, 0, 3, 2),
+    (2.67489271e-08, 0, 1, 3, 2),
+    (3.23926897e-09, 0, 0, 4, 2),
+    (-0.0353874123, 0, 0, 0, 3),
+    (-0.22120119, 1, 0, 0, 3),
+    (0.0155126038, 2, 0, 0, 3),
+    (-0.000263917279, 3, 0, 0, 3),
+    (0.0453433455, 0, 1, 0, 3),
+    (-0.00432943862, 1, 1, 0, 3),
+    (0.000145389826, 2, 1, 0, 3),
+    (0.00021750861, 0, 2, 0, 3),
+    (-6.66724702e-05, 1, 2, 0, 3),
+    (3.3321714e-05, 0, 3, 0, 3),
+    (-0.00226921615, 0, 0, 1, 3),
+    (0.000380261982, 1, 0, 1, 3),
+    (-5.45314314e-09, 2, 0, 1, 3),
+    (-0.000796355448, 0, 1, 1, 3),
+    (2.53458034e-05, 1, 1, 1, 3),
+    (-6.31223658e-06, 0, 2, 1, 3),
+    (0.000302122035, 0, 0, 2, 3),
+    (-4.77403547e-06, 1, 0, 2, 3),
+    (1.73825715e-06, 0, 1, 2, 3),
+    (-4.09087898e-07, 0, 0, 3, 3),
+    (0.614155345, 0, 0, 0, 4),
+    (-0.0616755931, 1, 0, 0, 4),
+    (0.00133374846, 2, 0, 0, 4),
+    (0.00355375387, 0, 1, 0, 4),
+    (-0.000513027851, 1, 1, 0, 4),
+    (0.000102449757, 0, 2, 0, 4),
+    (-0.00148526421, 0, 0, 1, 4),
+    (-4.11469183e-05, 1, 0, 1, 4),
+    (-6.80434415e-06, 0, 1, 1, 4),
+    (-9.77675906e-06, 0, 0, 2, 4),
+    (0.0882773108, 0, 0, 0, 5),
+    (-0.00301859306, 1, 0, 0, 5),
+    (0.00104452989, 0, 1, 0, 5),
+    (0.000247090539, 0, 0, 1, 5),
+    (0.00148348065, 0, 0, 0, 6),
+)
+
+
+def _powers(x, degree=6):
+    """Return [x**0, x**1, ..., x**degree] computed by repeated products."""
+    powers = [np.ones_like(x), x]
+    for _ in range(degree - 1):
+        powers.append(powers[-1] * x)
+    return powers
+
+
+def utci_array(tdb, tr, v, rh):
+    """Return the Universal Thermal Climate Index for arrays of inputs.
+
+    Array version of pythermalcomfort.models.utci (SI units), the polynomial is
+    evaluated on the whole arrays at once instead of hour by hour.
+
+    Parameters
+    ----------
+    tdb : array_like
+        dry bulb air temperature, [°C]
+    tr : array_like
+        mean radiant temperature, [°C]
+    v : array_like
+        wind speed 10m above ground level, [m/s]
+    rh : array_like
+        relative humidity, [%]
+
+    Returns
+    -------
+    utci : numpy.ndarray
+        Universal Thermal Climate Index rounded to one decimal, [°C]
+    """
+    tdb = np.asarray(tdb, dtype=float)
+    tr = np.asarray(tr, dtype=float)
+    v = np.asarray(v, dtype=float)
+    rh = np.asarray(rh, dtype=float)
+
+    delta_t_tr = tr - tdb
+    if np.any(
+        (tdb < -50.0)
+        | (tdb > 50.0)
+        | (delta_t_tr < -30.0)
+        | (delta_t_tr > 70.0)
+        | (v < 0.5)
+        | (v > 17)
+    ):
+        raise ValueError(
+            "The value you entered are outside the equation applicability limits"
+        )
+
+    # saturation vapour pressure, same formula as pythermalcomfort
+    tk = tdb + 273.15
+    es = 2.7150305 * np.log1p(tk)
+    for count, g in enumerate(
+        [
+            -2836.5744,
+            -6028.076559,
+            19.54263612,
+            -0.02737830188,
+            0.000016261698,
+            7.0229056e-10,
+            -1.8680009e-13,
+        ]
+    ):
+        es = es + g * tk ** (count - 2)
+    es = np.exp(es) * 0.01  # convert Pa to hPa
+    pa = es * (rh / 100.0) / 10.0  # vapour pressure in kPa
+
+    tdb_pow = _powers(tdb)
+    v_pow = _powers(v)
+    delta_pow = _powers(delta_t_tr)
+    pa_pow = _powers(pa)
+
+    utci_approx = np.zeros_like(tdb)
+    for coefficient, i, j, k, m in UTCI_POLYNOMIAL:
+        utci_approx += coefficient * tdb_pow[i] * v_pow[j] * delta_pow[k] * pa_pow[m]
+
+    return np.round(utci_approx, 1)
+
+
+# projected area factor tables, rows are SHARP from 0 to 180 deg every 15 deg
+# and columns solar altitude from 0 to 90 deg every 15 deg (ASHRAE 55 2017)
+FP_TABLES = {
+    "standing": np.array(
+        [
+            [0.35, 0.35, 0.314, 0.258, 0.206, 0.144, 0.082],
+            [0.342, 0.342, 0.31, 0.252, 0.2, 0.14, 0.082],
+            [0.33, 0.33, 0.3, 0.244, 0.19, 0.132, 0.082],
+            [0.31, 0.31, 0.275, 0.228, 0.175, 0.124, 0.082],
+            [0.283, 0.283, 0.251, 0.208, 0.16, 0.114, 0.082],
+            [0.252, 0.252, 0.228, 0.188, 0.15, 0.108, 0.082],
+            [0.23, 0.23, 0.214, 0.18, 0.148, 0.108, 0.082],
+            [0.242, 0.242, 0.222, 0.18, 0.153, 0.112, 0.082],
+            [0.274, 0.274, 0.245, 0.203, 0.165, 0.116, 0.082],
+            [0.304, 0.304, 0.27, 0.22, 0.174, 0.121, 0.082],
+            [0.328, 0.328, 0.29, 0.234, 0.183, 0.125, 0.082],
+            [0.344, 0.344, 0.304, 0.244, 0.19, 0.128, 0.082],
+            [0.347, 0.347, 0.308, 0.246, 0.191, 0.128, 0.082],
+        ]
+    ),
+    "seated": np.array(
+        [
+            [0.29, 0.324, 0.305, 0.303, 0.262, 0.224, 0.177],
+            [0.292, 0.328, 0.294, 0.288, 0.268, 0.227, 0.177],
+            [0.288, 0.332, 0.298, 0.29, 0.264, 0.222, 0.177],
+            [0.274, 0.326, 0.294, 0.289, 0.252, 0.214, 0.177],
+            [0.254, 0.308, 0.28, 0.276, 0.241, 0.202, 0.177],
+            [0.23, 0.282, 0.262, 0.26, 0.233, 0.193, 0.177],
+            [0.216, 0.26, 0.248, 0.244, 0.22, 0.186, 0.177],
+            [0.234, 0.258, 0.236, 0.227, 0.208, 0.18, 0.177],
+            [0.262, 0.26, 0.224, 0.208, 0.196, 0.176, 0.177],
+            [0.28, 0.26, 0.21, 0.192, 0.184, 0.17, 0.177],
+            [0.298, 0.256, 0.194, 0.174, 0.168, 0.168, 0.177],
+            [0.306, 0.25, 0.18, 0.156, 0.156, 0.166, 0.177],
+            [0.3, 0.24, 0.168, 0.152, 0.152, 0.164, 0.177],
+        ]
+    ),
+}
+FP_TABLES["supine"] = FP_TABLES["standing"]
+
+
+def _find_span(grid, x):
+    """Return the index of the grid interval containing each value of x."""
+    return np.clip(np.searchsorted(grid, x, side="left") - 1, 0, len(grid) - 2)
+
+
+def solar_gain_array(
+    sol_altitude,
+    sharp,
+    sol_radiation_dir,
+    sol_transmittance,
+    f_svv,
+    f_bes,
+    asw=0.7,
+    posture="seated",
+    floor_reflectance=0.6,
+):
+    """Return the solar gain to the human body for arrays of inputs.
+
+    Array version of pythermalcomfort.models.solar_gain. The numeric parameters
+    can be either scalars or arrays and are broadcast against each other, so
+    constants do not need to be repeated for each hour of the year.
+
+    Parameters
+    ----------
+    sol_altitude : array_like
+        Solar altitude, degrees from horizontal [deg]. Ranges between 0 and 90.
+    sharp : array_like
+        Solar horizontal angle relative to the front of the person (SHARP) [deg].
+    sol_radiation_dir : array_like
+        Direct-beam solar radiation, [W/m2].
+    sol_transmittance : array_like
+        Total solar transmittance, ranges from 0 to 1.
+    f_svv : array_like
+        Fraction of sky-vault view fraction exposed to body, ranges from 0 to 1.
+    f_bes : array_like
+        Fraction of the possible body surface exposed to sun, ranges from 0 to 1.
+    asw : array_like
+        The average short-wave absorptivity of the occupant.
+    posture : str
+        Default 'seated' list of available options 'standing', 'supine' or 'seated'
+    floor_reflectance : array_like
+        Floor reflectance, ranges from 0 to 1.
+
+    Returns
+    -------
+    dict
+        "erf" effective radiant field [W/m2] and "delta_mrt" delta mean radiant
+        temperature [°C], as arrays rounded to one decimal
+    """
+    posture = posture.lower()
+    if posture not in FP_TABLES:
+        raise ValueError("Posture has to be either standing, supine or seated")
+
+    (
+        sol_altitude,
+        sharp,
+        sol_radiation_dir,
+        sol_transmittance,
+        f_svv,
+        f_bes,
+        asw,
+        floor_reflectance,
+    ) = np.broadcast_arrays(
+        *[
+            np.asarray(x, dtype=float)
+            for x in (
+                sol_altitude,
+                sharp,
+                sol_radiation_dir,
+                sol_transmittance,
+                f_svv,
+                f_bes,
+                asw,
+                floor_reflectance,
+            )
+        ]
+    )
+
+    deg_to_rad = 0.0174532925
+    hr = 6
+    i_diff = 0.2 * sol_radiation_dir
+
+    if posture == "supine":
+        altitude_new = np.round(
+            np.degrees(
+                np.arcsin(
+                    np.sin(np.radians(np.abs(sharp - 90)))
+                    * np.cos(np.radians(sol_altitude))
+                )
+            ),
+            3,
+        )
+        sharp = np.round(
+            np.degrees(
+                np.arctan(
+                    np.sin(np.radians(sharp)) * np.tan(np.radians(90 - sol_altitude))
+                )
+            ),
+            3,
+        )
+        sol_altitude = altitude_new
+
+    # bilinear interpolation of the projected area factor
+    fp_table = FP_TABLES[posture]
+    alt_range = np.arange(0, 91, 15)
+    az_range = np.arange(0, 181, 15)
+    alt_i = _find_span(alt_range, sol_altitude)
+    az_i = _find_span(az_range, sharp)
+    alt1 = alt_range[alt_i]
+    alt2 = alt_range[alt_i + 1]
+    az1 = az_range[az_i]
+    az2 = az_range[az_i + 1]
+    fp = fp_table[az_i, alt_i] * (az2 - sharp) * (alt2 - sol_altitude)
+    fp += fp_table[az_i + 1, alt_i] * (sharp - az1) * (alt2 - sol_altitude)
+    fp += fp_table[az_i, alt_i + 1] * (az2 - sharp) * (sol_altitude - alt1)
+    fp += fp_table[az_i + 1, alt_i + 1] * (sharp - az1) * (sol_altitude - alt1)
+    fp /= (az2 - az1) * (alt2 - alt1)
+
+    f_eff = 0.725  # fraction of the body surface exposed to environmental radiation
+    if posture == "seated":
+        f_eff = 0.696
+
+    lw_abs = 0.95
+
+    e_diff = f_eff * f_svv * 0.5 * sol_transmittance * i_diff
+    e_direct = f_eff * fp * sol_transmittance * f_bes * sol_radiation_dir
+    e_reflected = (
+        f_eff
+        * f_svv
+        * 0.5
+        * sol_transmittance
+        * (sol_radiation_dir * np.sin(sol_altitude * deg_to_rad) + i_diff)
+        * floor_reflectance
+    )
+
+    e_solar = e_diff + e_direct + e_reflected
+    erf = e_solar * (asw / lw_abs)
+    d_mrt = erf / (hr * f_eff)
+
+    return {"erf": np.round(erf, 1), "delta_mrt": np.round(d_mrt, 1)}
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+from dash.exceptions import PreventUpdate
+
+from my_project.utils import evict_least_recently_used, touch_file, write_atomically
+
+DATASETS_DIR = "./cache-directory/datasets"
+LOCATIONS_DIR = "./cache-directory/locations"
+MAX_DATASETS_IN_MEMORY = 32
+MAX_DERIVED_IN_MEMORY = 256
+MAX_DATASETS_ON_DISK_MB = 2048
+# bump when create_df changes so that locations processed before are ignored
+PROCESSING_VERSION = 2
+
+_datasets = OrderedDict()
+_derived = OrderedDict()
+_lock = threading.Lock()
+
+
+def dataset_key(df):
+    """Return the content hash used to identify a processed dataset."""
+    hashes = pd.util.hash_pandas_object(df, index=True).values
+    return hashlib.sha1(hashes.tobytes()).hexdigest()
+
+
+def _dataset_path(key):
+    return os.path.join(DATASETS_DIR, f"{key}.pkl")
+
+
+def _keep_in_memory(key, df):
+    with _lock:
+        _datasets[key] = df
+        _datasets.move_to_end(key)
+        while len(_datasets) > MAX_DATASETS_IN_MEMORY:
+            _datasets.popitem(last=False)
+
+
+def register_dataset(df, keep_in_memory=True):
+    """Store the processed dataframe server side and return its key.
+
+    The key is what goes in the 'df-store', so callbacks only exchange a short
+    string with the browser instead of the whole serialized dataframe. The
+    dataframe is also written to disk so that every worker can resolve it.
+    Processes which do not serve the dataset, e.g. the EPW job workers, only
+    write it to disk with keep_in_memory=False.
+    """
+    key = dataset_key(df)
+    if keep_in_memory:
+        _keep_in_memory(key, df)
+
+    _keep_on_disk(key, df)
+    return key
+
+
+def _keep_on_disk(key, df):
+    path = _dataset_path(key)
+    if os.path.isfile(path):
+        touch_file(path)
+    else:
+        write_atomically(path, df.to_pickle)
+        evict_least_recently_used(DATASETS_DIR, MAX_DATASETS_ON_DISK_MB)
+
+
+def get_dataset(key):
+    """Return a copy of the dataframe registered under key, None if unknown."""
+    # the key comes from the browser, only accept what dataset_key produces
+    if not isinstance(key, str) or not re.fullmatch(r"[0-9a-f]{40}", key):
+        return None
+
+    with _lock:
+        df = _datasets.get(key)
+        if df is not None:
+            _datasets.move_to_end(key)
+
+    if df is not None:
+        touch_file(_dataset_path(key))
+    else:
+        try:
+            df = pd.read_pickle(_dataset_path(key))
+        except (FileNotFoundError, EOFError):
+            return None
+        _keep_in_memory(key, df)
+
+    # callbacks filter the dataframe in place, never hand out the stored one
+    return df.copy()
+
+
+def load_dataset(key):
+    """Return the dataframe in the 'df-store', stop the callback if it is gone."""
+    df = get_dataset(key)
+    if df is None:
+        raise PreventUpdate
+    return df
+
+
+def load_derived(key, compute):
+    """Return compute(df) for the dataset in the 'df-store', computed only once.
+
+    Use it for the summaries of a dataset that several callbacks slice, e.g.
+    the wind rose histogram. The result is shared, do not modify it.
+    """
+    derived_key = (key, compute.__module__, compute.__qualname__)
+    with _lock:
+        if derived_key in _derived:
+            _derived.move_to_end(derived_key)
+            return _derived[derived_key]
+
+    value = compute(load_dataset(key))
+
+    with _lock:
+        _derived[derived_key] = value
+        while len(_derived) > MAX_DERIVED_IN_MEMORY:
+            _derived.popitem(last=False)
+    return value
+
+
+def _location_path(url):
+    url_hash = hashlib.sha1(f"{PROCESSING_VERSION}:{url}".encode()).hexdigest()
+    return os.path.join(LOCATIONS_DIR, f"{url_hash}.json")
+
+
+def cache_location(url, key, location_info):
+    """Remember which dataset has been processed from the EPW at url."""
+    content = json.dumps({"url": url, "key": key, "location_info": location_info})
+
+    def write(path):
+        with open(path, "w", encoding="utf8") as f:
+            f.write(content)
+
+    write_atomically(_location_path(url), write)
+
+
+def get_cached_location(url):
+    """Return the dataset key and location info processed from url, if any.
+
+    Locations whose dataset has been evicted are treated as not cached. A
+    dataset only left in the memory of this worker is written back to disk, as
+    the other workers have to resolve its key too.
+    """
+    if not url:
+        return None
+    try:
+        with open(_location_path(url), encoding="utf8") as f:
+            cached = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    key = cached["key"]
+    with _lock:
+        df = _datasets.get(key)
+    if df is not None:
+        _keep_on_disk(key, df)
+    elif os.path.isfile(_dataset_path(key)):
+        touch_file(_dataset_path(key))
+    else:
+        return None
+
+    return key, cached["location_info"]
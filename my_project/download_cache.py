@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import time
+
+import requests
+
+from my_project.utils import evict_least_recently_used, touch_file, write_atomically
+
+DOWNLOADS_DIR = "./cache-directory/downloads"
+MAX_DOWNLOADS_ON_DISK_MB = 512
+# seconds during which a downloaded file is used without asking the server
+DOWNLOAD_MAX_AGE = 24 * 3600
+DOWNLOAD_TIMEOUT = 60
+
+
+def _entry_path(url):
+    url_hash = hashlib.sha1(url.encode()).hexdigest()
+    return os.path.join(DOWNLOADS_DIR, "urls", f"{url_hash}.json")
+
+
+def _content_path(digest):
+    return os.path.join(DOWNLOADS_DIR, "content", digest)
+
+
+def _read_cached(url):
+    """Return the cache entry of url and its content, (None, None) if missing."""
+    try:
+        with open(_entry_path(url), encoding="utf8") as f:
+            entry = json.load(f)
+        with open(_content_path(entry["digest"]), "rb") as f:
+            content = f.read()
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        return None, None
+    touch_file(_content_path(entry["digest"]))
+    return entry, content
+
+
+def _write_entry(url, entry):
+    def write(path):
+        with open(path, "w", encoding="utf8") as f:
+            json.dump(entry, f)
+
+    write_atomically(_entry_path(url), write)
+
+
+def _store(url, response):
+    """Save the content of the response and return it."""
+    content = response.content
+    digest = hashlib.sha1(content).hexdigest()
+    content_path = _content_path(digest)
+
+    if os.path.isfile(content_path):
+        touch_file(content_path)
+    else:
+
+        def write(path):
+            with open(path, "wb") as f:
+                f.write(content)
+
+        write_atomically(content_path, write)
+        evict_least_recently_used(
+            os.path.dirname(content_path), MAX_DOWNLOADS_ON_DISK_MB
+        )
+
+    _write_entry(
+        url,
+        {
+            "url": url,
+            "digest": digest,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "checked": time.time(),
+        },
+    )
+    return content
+
+
+def cached_download(url, headers=None):
+    """Return the content at url, None if it is not available.
+
+    Downloaded files are kept on disk, addressed by the hash of their content.
+    A file younger than DOWNLOAD_MAX_AGE is returned without contacting the
+    server, an older one is revalidated with its ETag and Last-Modified date.
+    The cached copy is also used if the server cannot be reached or answers
+    with an error.
+    """
+    entry, content = _read_cached(url)
+    if content is not None and time.time() - entry["checked"] < DOWNLOAD_MAX_AGE:
+        return content
+
+    request_headers = dict(headers or {})
+    if content is not None:
+        if entry["etag"]:
+            request_headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            request_headers["If-Modified-Since"] = entry["last_modified"]
+
+    try:
+        response = requests.get(url, headers=request_headers, timeout=DOWNLOAD_TIMEOUT)
+    except requests.RequestException as e:
+        print(f"Could not download {url}: {e}")
+        return content
+
+    if response.status_code == 304 and content is not None:
+        _write_entry(url, {**entry, "checked": time.time()})
+        return content
+    if not response.ok:
+        print(f"Could not download {url}: {response.status_code}")
+        return content
+
+    return _store(url, response)
@@ -0,0 +1,151 @@
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from my_project.dataset_registry import cache_location, register_dataset
+from my_project.epw_reader import EpwFormatError
+from my_project.extract_df import create_df, get_data
+from my_project.utils import evict_least_recently_used, write_atomically
+
+JOBS_DIR = "./cache-directory/jobs"
+MAX_JOBS_ON_DISK_MB = 1
+# EPW files processed at the same time by each gunicorn worker
+EPW_JOB_WORKERS = 2
+# seconds after which a job whose stage does not change is given up, e.g. its
+# gunicorn worker was restarted, longer than a download or a queue under load
+EPW_JOB_TIMEOUT = 5 * 60
+
+# stages of the processing of an EPW, in order, and how they are reported
+job_stages = {
+    "queued": "Waiting for the other weather files to be processed",
+    "download": "Downloading the EPW file",
+    "parse": "Reading the EPW file",
+    "solar": "Calculating the position of the sun",
+    "utci": "Calculating the Universal Thermal Climate Index",
+    "psychrometrics": "Calculating the psychrometric variables",
+    "done": "The EPW has been processed",
+}
+
+_pool = None
+_lock = threading.Lock()
+
+
+def _job_path(job_id):
+    return os.path.join(JOBS_DIR, f"{job_id}.json")
+
+
+def _write_status(job_id, stage, **result):
+    content = json.dumps({"stage": stage, "updated": time.time(), **result})
+
+    def write(path):
+        with open(path, "w", encoding="utf8") as f:
+            f.write(content)
+
+    write_atomically(_job_path(job_id), write)
+
+
+def process_epw(job_id, url=None, text=None, file_name=None):
+    """Process the EPW at url, or the text of an uploaded one, in a job.
+
+    Runs in a worker process and reports each stage in the status of the job.
+    Once done the status has the key of the dataset and the location info, or
+    an "error" with the key of the message to show and its "detail".
+    """
+    try:
+        if url is not None:
+            _write_status(job_id, "download")
+            lines = get_data(url)
+            if lines is None:
+                _write_status(job_id, "done", error="not_available")
+                return
+            file_name = url
+        else:
+            lines = text.split("\n")
+
+        df, location_info = create_df(
+            lines, file_name, progress=lambda stage: _write_status(job_id, stage)
+        )
+        # the web workers read it from disk, the job workers never serve it
+        key = register_dataset(df, keep_in_memory=False)
+        if url is not None:
+            cache_location(url, key, location_info)
+    except EpwFormatError as e:
+        # the EPW reader reports which lines could not be parsed
+        _write_status(job_id, "done", error="invalid_format", detail=str(e))
+    except Exception as e:
+        # e.g. the comfort models reject the climate of a valid EPW
+        print(f"EPW job {job_id} failed: {e!r}")
+        _write_status(job_id, "done", error="processing_failed", detail=str(e))
+    else:
+        _write_status(job_id, "done", key=key, location_info=location_info)
+
+
+def _job_failed(job_id, future):
+    # e.g. the worker process was killed, process_epw could not report it
+    if future.exception() is not None:
+        print(f"EPW job {job_id} failed: {future.exception()}")
+        _write_status(job_id, "done", error="not_available")
+
+
+def submit_epw_job(url=None, text=None, file_name=None):
+    """Queue the processing of an EPW and return the id of the job.
+
+    The EPW at url is downloaded, or the text of the uploaded file_name is
+    parsed, by a pool of worker processes so that the web threads are never
+    blocked. Poll the progress with epw_job_status.
+    """
+    global _pool
+
+    job_id = uuid.uuid4().hex
+    os.makedirs(JOBS_DIR, exist_ok=True)
+    evict_least_recently_used(JOBS_DIR, MAX_JOBS_ON_DISK_MB)
+    _write_status(job_id, "queued")
+
+    with _lock:
+        for attempt in range(2):
+            if _pool is None:
+                # fork is not safe with the threads of the web server
+                _pool = ProcessPoolExecutor(
+                    max_workers=EPW_JOB_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            try:
+                future = _pool.submit(process_epw, job_id, url, text, file_name)
+                break
+            except BrokenProcessPool:
+                _pool = None
+                if attempt:
+                    raise
+
+    future.add_done_callback(lambda future: _job_failed(job_id, future))
+    return job_id
+
+
+def epw_job_status(job_id):
+    """Return the status of the job, None if it is unknown.
+
+    The status has the "stage" the job is at, see job_stages, and when it was
+    "updated". Jobs are run by any of the gunicorn workers, their status is
+    shared on disk.
+    """
+    # the id comes from the browser, only accept what submit_epw_job produces
+    if not isinstance(job_id, str) or not re.fullmatch(r"[0-9a-f]{32}", job_id):
+        return None
+    try:
+        with open(_job_path(job_id), encoding="utf8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def epw_job_stalled(status):
+    """Return whether the job of status is not done and no longer progressing."""
+    return (
+        status["stage"] != "done" and time.time() - status["updated"] > EPW_JOB_TIMEOUT
+    )
@@ -0,0 +1,145 @@
+import io
+import re
+
+import numpy as np
+import pandas as pd
+
+HEADER_LINES = 8
+HOURS_IN_YEAR = 8760
+
+# position of each column Clima uses in the 35 fields of an EPW data record
+epw_columns = {
+    "year": 0,
+    "month": 1,
+    "day": 2,
+    "hour": 3,
+    "DBT": 6,
+    "DPT": 7,
+    "RH": 8,
+    "p_atm": 9,
+    "extr_hor_rad": 10,
+    "hor_ir_rad": 12,
+    "glob_hor_rad": 13,
+    "dir_nor_rad": 14,
+    "dif_hor_rad": 15,
+    "glob_hor_ill": 16,
+    "dir_nor_ill": 17,
+    "dif_hor_ill": 18,
+    "Zlumi": 19,
+    "wind_dir": 20,
+    "wind_speed": 21,
+    "tot_sky_cover": 22,
+    "Oskycover": 23,
+    "Vis": 24,
+    "Cheight": 25,
+    "PWobs": 26,
+    "PWcodes": 27,
+    "Pwater": 28,
+    "AsolOptD": 29,
+    "SnowD": 30,
+    "DaySSnow": 31,
+}
+epw_fields = 35
+calendar_columns = ["year", "month", "day", "hour"]
+# value used by the EPW format for missing data
+missing_value = 9999.0
+
+
+class EpwFormatError(ValueError):
+    """The lines given are not a valid EPW file."""
+
+
+def read_epw_header(lines):
+    """Return the location information stored in the EPW header block.
+
+    An EpwFormatError is raised if the LOCATION record cannot be parsed.
+    """
+    if len(lines) < HEADER_LINES:
+        raise EpwFormatError(f"Malformed EPW header: fewer than {HEADER_LINES} lines")
+    meta = lines[0].strip().split(",")
+
+    try:
+        location_info = {
+            "lat": float(meta[-4]),
+            "lon": float(meta[-3]),
+            "time_zone": float(meta[-2]),
+            "site_elevation": meta[-1],
+            "city": meta[1],
+            "state": meta[2],
+            "country": meta[3],
+            "period": None,
+        }
+    except (IndexError, ValueError) as e:
+        raise EpwFormatError(f"Malformed EPW header: {lines[0][:100]}") from e
+
+    # from OneClimaBuilding files extract info about reference years
+    period = re.search(r'cord=[\'"]?([^\'" >]+);', lines[5])
+    if period:
+        location_info["period"] = period.group(1)
+
+    return location_info
+
+
+def _malformed_rows(raw):
+    """Return the file line numbers of the rows with non numeric values."""
+    numeric = raw.apply(pd.to_numeric, errors="coerce")
+    bad = numeric.isna() & raw.notna()
+    return (raw.index[bad.any(axis=1)] + HEADER_LINES + 1).tolist()
+
+
+def read_epw_data(lines):
+    """Return the hourly records of an EPW file as a typed dataframe.
+
+    The data block is parsed in a single pass with fixed dtypes, the calendar
+    columns are int16 and all the others float. Columns missing from the file
+    are filled with the EPW missing value 9999. An EpwFormatError reporting the
+    file line numbers is raised if some records cannot be parsed.
+    """
+    text = io.StringIO("\n".join(lines))
+    # usecols is not used since it fails on files with fewer than 35 fields
+    read_options = dict(
+        header=None,
+        names=range(epw_fields),
+        skiprows=HEADER_LINES,
+        nrows=HOURS_IN_YEAR,
+        skipinitialspace=True,
+    )
+
+    try:
+        epw_df = pd.read_csv(
+            text, dtype={i: float for i in epw_columns.values()}, **read_options
+        )
+    except pd.errors.ParserError as e:
+        # the C parser already counts the lines from the top of the file
+        raise EpwFormatError(
+            f"Malformed EPW data: {str(e).split('C error: ')[-1].strip()}"
+        ) from e
+    except ValueError as e:
+        text.seek(0)
+        raw = pd.read_csv(text, dtype=str, **read_options)[epw_columns.values()]
+        rows = _malformed_rows(raw)
+        raise EpwFormatError(
+            f"Malformed EPW data: non numeric values in lines {rows[:10]}"
+        ) from e
+
+    epw_df = epw_df[epw_columns.values()].set_axis(list(epw_columns), axis=1)
+
+    if epw_df.shape[0] != HOURS_IN_YEAR:
+        raise EpwFormatError(
+            f"Malformed EPW data: expected {HOURS_IN_YEAR} hourly records, "
+            f"found {epw_df.shape[0]}"
+        )
+
+    invalid_calendar = epw_df[calendar_columns].isna().any(axis=1)
+    if invalid_calendar.any():
+        rows = (np.flatnonzero(invalid_calendar) + HEADER_LINES + 1).tolist()
+        raise EpwFormatError(
+            f"Malformed EPW data: missing date or hour in lines {rows[:10]}"
+        )
+    epw_df[calendar_columns] = epw_df[calendar_columns].astype(np.int16)
+
+    # columns not present in the file
+    empty = [col for col in epw_df.columns if epw_df[col].isna().all()]
+    epw_df[empty] = missing_value
+
+    return epw_df
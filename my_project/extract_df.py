@@ -1,124 +1,60 @@
 import io
-import re
 import zipfile
 from datetime import timedelta
-from urllib.request import Request, urlopen
 
 import pandas as pd
 import numpy as np
-import requests
+from my_project.download_cache import cached_download
 from my_project.utils import code_timer
-from pvlib import solarposition
-from pythermalcomfort.models import utci
-from pythermalcomfort.models import solar_gain as sgain
-from pythermalcomfort import psychrometrics as psy
 import math
 from my_project.global_scheme import month_lst
+from my_project.comfort import solar_gain_array, utci_array
+from my_project.solar_position import hourly_solar_position
+from my_project.psychro import psy_ta_rh
+from my_project.epw_reader import read_epw_data, read_epw_header
+
+
+def decode_epw(data):
+    """Return the text of an EPW file, not all the files are utf-8 encoded."""
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return data.decode("latin-1")
 
 
 @code_timer
 def get_data(source_url):
     """Return a list of the data from api call."""
     if source_url[-3:] == "zip" or source_url[-3:] == "all":
-        request = requests.get(source_url)
-        if request.status_code != 404:
-            zf = zipfile.ZipFile(io.BytesIO(request.content))
-            for i in zf.namelist():
-                if i[-3:] == "epw":
-                    epw_name = i
-                    data = zf.read(epw_name)
-                    data = repr(data).split("\\n")
-                    return data
-        else:
+        content = cached_download(source_url)
+        if content is None:
             print("returning none")
             return None
+        zf = zipfile.ZipFile(io.BytesIO(content))
+        for i in zf.namelist():
+            if i[-3:] == "epw":
+                return decode_epw(zf.read(i)).split("\n")
     else:
-        try:
-            headers = {"User-Agent": "Mozilla/5.0"}
-            req = Request(source_url, headers=headers)
-            epw = urlopen(req).read().decode()
-            return epw.split("\n")
-        except:
+        content = cached_download(source_url, headers={"User-Agent": "Mozilla/5.0"})
+        if content is None:
             return None
+        return decode_epw(content).split("\n")
 
 
 @code_timer
-def create_df(lst, file_name):
-    """Extract and clean the data. Return a pandas data from a url."""
-    meta = lst[0].strip().replace("\\r", "").split(",")
-
-    location_info = {
-        "url": file_name,
-        "lat": float(meta[-4]),
-        "lon": float(meta[-3]),
-        "time_zone": float(meta[-2]),
-        "site_elevation": meta[-1],
-        "city": meta[1],
-        "state": meta[2],
-        "country": meta[3],
-        "period": None,
-    }
-
-    # from OneClimaBuilding files extract info about reference years
-    try:
-        location_info["period"] = re.search(r'cord=[\'"]?([^\'" >]+);', lst[5]).group(1)
-    except AttributeError:
-        pass
-
-    lst = lst[8:8768]
-    lst = [line.strip().split(",") for line in lst]
-
-    # Each data row exclude index 4 and 5, and everything after days now
-    for line in lst:
-        del line[4:6]
-        del line[9]
-        del line[-1]
-        del line[-1]
-        del line[-1]
-
-    col_names = [
-        "year",
-        "month",
-        "day",
-        "hour",
-        "DBT",
-        "DPT",
-        "RH",
-        "p_atm",
-        "extr_hor_rad",
-        "hor_ir_rad",
-        "glob_hor_rad",
-        "dir_nor_rad",
-        "dif_hor_rad",
-        "glob_hor_ill",
-        "dir_nor_ill",
-        "dif_hor_ill",
-        "Zlumi",
-        "wind_dir",
-        "wind_speed",
-        "tot_sky_cover",
-        "Oskycover",
-        "Vis",
-        "Cheight",
-        "PWobs",
-        "PWcodes",
-        "Pwater",
-        "AsolOptD",
-        "SnowD",
-        "DaySSnow",
-    ]
+def create_df(lst, file_name, progress=lambda stage: None):
+    """Extract and clean the data. Return a pandas data from a url.
 
-    # assign column names and if fewer cols are there than supposed assign 9999 to that col
-    if len(lst[0]) < len(col_names):
-        epw_df = pd.DataFrame(columns=col_names[: len(lst[0])], data=lst)
-        for col in [x for ix, x in enumerate(col_names) if ix >= len(lst[0])]:
-            epw_df[col] = 9999
-    else:
-        epw_df = pd.DataFrame(columns=col_names, data=lst)
+    progress is called with the name of each stage of the processing when it
+    starts: "parse", "solar", "utci" and "psychrometrics".
+    """
+    progress("parse")
+    location_info = {"url": file_name, **read_epw_header(lst)}
+    epw_df = read_epw_data(lst)
 
     # from EnergyPlus files extract info about reference years
     if not location_info["period"]:
-        years = epw_df["year"].astype("int").unique()
+        years = epw_df["year"].unique()
         if len(years) == 1:
             year_rounded_up = int(math.ceil(years[0] / 10.0)) * 10
             location_info["period"] = f"{year_rounded_up-10}-{year_rounded_up}"
@@ -132,52 +68,10 @@ def create_df(lst, file_name):
 
     # Add in month names
     month_look_up = {ix + 1: month for ix, month in enumerate(month_lst)}
-    epw_df["month_names"] = epw_df["month"].astype("int").map(month_look_up)
+    epw_df["month_names"] = epw_df["month"].map(month_look_up)
 
     # Add in DOY
-    epw_df["DOY"] = pd.to_datetime(
-        (
-            epw_df["year"].astype(int) * 10000
-            + epw_df["month"].astype(int) * 100
-            + epw_df["day"].astype(int)
-        ).apply(str),
-        format="%Y%m%d",
-    ).dt.dayofyear
-
-    # Change to int type
-    change_to_int = ["year", "day", "month", "hour"]
-    for col in change_to_int:
-        epw_df[col] = epw_df[col].astype(int)
-
-    change_to_float = [
-        "DBT",
-        "DPT",
-        "RH",
-        "p_atm",
-        "extr_hor_rad",
-        "hor_ir_rad",
-        "glob_hor_rad",
-        "dir_nor_rad",
-        "dif_hor_rad",
-        "glob_hor_ill",
-        "dir_nor_ill",
-        "dif_hor_ill",
-        "Zlumi",
-        "wind_dir",
-        "wind_speed",
-        "tot_sky_cover",
-        "Oskycover",
-        "Vis",
-        "Cheight",
-        "PWobs",
-        "PWcodes",
-        "Pwater",
-        "AsolOptD",
-        "SnowD",
-        "DaySSnow",
-    ]
-    for col in change_to_float:
-        epw_df[col] = epw_df[col].astype(float)
+    epw_df["DOY"] = pd.to_datetime(epw_df[["year", "month", "day"]]).dt.dayofyear
 
     # Add in times df
     times = pd.date_range(
@@ -192,38 +86,28 @@ def create_df(lst, file_name):
     )
 
     # Add in solar position df
-    solar_position = solarposition.get_solarposition(
-        times, location_info["lat"], location_info["lon"]
+    progress("solar")
+    solar_position = hourly_solar_position(
+        location_info["lat"], location_info["lon"], location_info["time_zone"]
     )
     epw_df = pd.concat([epw_df, solar_position], axis=1)
 
     # Add in UTCI
+    progress("utci")
     sol_altitude = epw_df["elevation"].mask(epw_df["elevation"] <= 0, 0)
-    sharp = [45] * 8760
-    sol_radiation_dir = epw_df["dir_nor_rad"]
-    sol_transmittance = [1] * 8760  # CHECK VALUE
-    f_svv = [1] * 8760  # CHECK VALUE
-    f_bes = [1] * 8760  # CHECK VALUE
-    asw = [0.7] * 8760  # CHECK VALUE
-    posture = ["standing"] * 8760
-    floor_reflectance = [0.6] * 8760  # EXPOSE AS A VARIABLE?
-
-    mrt = np.vectorize(sgain)(
-        sol_altitude,
-        sharp,
-        sol_radiation_dir,
-        sol_transmittance,
-        f_svv,
-        f_bes,
-        asw,
-        posture,
-        floor_reflectance,
+    mrt = solar_gain_array(
+        sol_altitude=sol_altitude.values,
+        sharp=45,
+        sol_radiation_dir=epw_df["dir_nor_rad"].values,
+        sol_transmittance=1,  # CHECK VALUE
+        f_svv=1,  # CHECK VALUE
+        f_bes=1,  # CHECK VALUE
+        asw=0.7,  # CHECK VALUE
+        posture="standing",
+        floor_reflectance=0.6,  # EXPOSE AS A VARIABLE?
     )
-    mrt_df = pd.DataFrame.from_records(mrt)
-    mrt_df["delta_mrt"] = mrt_df["delta_mrt"].mask(mrt_df["delta_mrt"] >= 70, 70)
-    mrt_df = mrt_df.set_index(epw_df.times)
-
-    epw_df = epw_df.join(mrt_df)
+    epw_df["erf"] = mrt["erf"]
+    epw_df["delta_mrt"] = np.minimum(mrt["delta_mrt"], 70)
 
     epw_df["MRT"] = epw_df["delta_mrt"] + epw_df["DBT"]
     epw_df["wind_speed_utci"] = epw_df["wind_speed"]
@@ -236,18 +120,22 @@ def create_df(lst, file_name):
     epw_df["wind_speed_utci_0"] = epw_df["wind_speed_utci"].mask(
         epw_df["wind_speed_utci"] >= 0, 0.5
     )
-    epw_df["utci_noSun_Wind"] = np.vectorize(utci)(
-        epw_df["DBT"], epw_df["DBT"], epw_df["wind_speed_utci"], epw_df["RH"]
-    )
-    epw_df["utci_noSun_noWind"] = np.vectorize(utci)(
-        epw_df["DBT"], epw_df["DBT"], epw_df["wind_speed_utci_0"], epw_df["RH"]
-    )
-    epw_df["utci_Sun_Wind"] = np.vectorize(utci)(
-        epw_df["DBT"], epw_df["MRT"], epw_df["wind_speed_utci"], epw_df["RH"]
-    )
-    epw_df["utci_Sun_noWind"] = np.vectorize(utci)(
-        epw_df["DBT"], epw_df["MRT"], epw_df["wind_speed_utci_0"], epw_df["RH"]
+    # mean radiant temperature and wind speed used in each scenario
+    utci_scenarios = {
+        "utci_noSun_Wind": ("DBT", "wind_speed_utci"),
+        "utci_noSun_noWind": ("DBT", "wind_speed_utci_0"),
+        "utci_Sun_Wind": ("MRT", "wind_speed_utci"),
+        "utci_Sun_noWind": ("MRT", "wind_speed_utci_0"),
+    }
+    # compute the four scenarios in a single pass
+    utci_values = utci_array(
+        tdb=np.tile(epw_df["DBT"].values, len(utci_scenarios)),
+        tr=np.concatenate([epw_df[tr].values for tr, _ in utci_scenarios.values()]),
+        v=np.concatenate([epw_df[v].values for _, v in utci_scenarios.values()]),
+        rh=np.tile(epw_df["RH"].values, len(utci_scenarios)),
     )
+    for col, values in zip(utci_scenarios, np.split(utci_values, len(utci_scenarios))):
+        epw_df[col] = values
 
     utci_bins = [-999, -40, -27, -13, 0, 9, 26, 32, 38, 46, 999]
     utci_labels = [-5, -4, -3, -2, -1, 0, 1, 2, 3, 4]
@@ -263,12 +151,20 @@ def create_df(lst, file_name):
     epw_df["utci_Sun_noWind_categories"] = pd.cut(
         x=epw_df["utci_Sun_noWind"], bins=utci_bins, labels=utci_labels
     )
+    # the tabs filter and color by these values as numbers
+    for col in [
+        "utci_noSun_Wind_categories",
+        "utci_noSun_noWind_categories",
+        "utci_Sun_Wind_categories",
+        "utci_Sun_noWind_categories",
+    ]:
+        epw_df[col] = epw_df[col].astype(int)
 
     # Add psy values
-    ta_rh = np.vectorize(psy.psy_ta_rh)(epw_df["DBT"], epw_df["RH"])
-    psy_df = pd.DataFrame.from_records(ta_rh)
-    psy_df = psy_df.set_index(epw_df.times)
-    epw_df = epw_df.join(psy_df)
+    progress("psychrometrics")
+    ta_rh = psy_ta_rh(epw_df["DBT"].values, epw_df["RH"].values)
+    for col, values in ta_rh.items():
+        epw_df[col] = values
 
     return epw_df, location_info
 
@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from app import app, cache
+from my_project.dataset_registry import get_dataset, load_dataset, load_derived
+from my_project.utils import evict_least_recently_used, write_atomically
+
+# prefix of the cache keys of the figures, CACHE_NAMESPACE_TIMEOUTS sets how
+# long they are kept
+FIGURE_NAMESPACE = "figure:"
+# datasets whose figures are pre-rendered at the same time by each worker
+PRERENDER_WORKERS = 2
+# location last loaded by each browser session, shared by all the workers
+PRERENDERS_DIR = "./cache-directory/prerenders"
+MAX_PRERENDERS_ON_DISK_MB = 1
+
+# (chart, args, derived) of the figures shown when a tab opens, see default_figure
+default_figures = []
+
+_prerender_pool = ThreadPoolExecutor(
+    max_workers=PRERENDER_WORKERS, thread_name_prefix="prerender"
+)
+# (session, generation) of the loads waiting for each dataset being pre-rendered
+_prerenders = {}
+_lock = threading.Lock()
+
+
+def figure_key(key, chart, args):
+    """Return the cache key of chart(df, *args) for the dataset key."""
+    arguments = hashlib.sha1(json.dumps(args, sort_keys=True).encode()).hexdigest()
+    return (
+        f"{FIGURE_NAMESPACE}{chart.__module__}.{chart.__qualname__}:{key}:{arguments}"
+    )
+
+
+def _render(key, df, chart, args, derived):
+    derived = {name: load_derived(key, compute) for name, compute in derived.items()}
+    return chart(df, *args, **derived).to_json()
+
+
+def load_figure(key, chart, *args, **derived):
+    """Return chart(df, *args) for the dataset in the 'df-store' as a dict.
+
+    The figure is cached serialized to JSON under the dataset key, the chart
+    and args, which must be JSON serializable. It is shared by all the users
+    who load the same EPW and by all the workers, on a hit neither chart nor
+    the validation of the go.Figure run. The dict returned is a new copy.
+
+    derived maps arguments of chart to functions of the dataset, whose values
+    are passed to chart from load_derived, e.g. ashrae=get_ashrae. They only
+    depend on the dataset, so they are not part of the key of the figure.
+    """
+    cache_key = figure_key(key, chart, args)
+    figure = cache.get(cache_key)
+    if figure is None:
+        figure = _render(key, load_dataset(key), chart, args, derived)
+        cache.set(cache_key, figure)
+    return json.loads(figure)
+
+
+def default_figure(chart, *args, **derived):
+    """Register chart(df, *args) as shown by a tab with its default inputs.
+
+    The default figures are rendered in the background by prerender_figures as
+    soon as a dataset is loaded, so that opening the tabs hits the cache. The
+    derived values are passed as by load_figure.
+    """
+    if (chart, args, derived) not in default_figures:
+        default_figures.append((chart, args, derived))
+
+
+def _session_path(session):
+    # the id comes from the browser, only accept what new_session produces
+    if not isinstance(session, str) or not re.fullmatch(r"[0-9a-f]{32}", session):
+        return None
+    return os.path.join(PRERENDERS_DIR, f"{session}.json")
+
+
+def new_session():
+    """Return the id of a browser session which loads locations."""
+    return uuid.uuid4().hex
+
+
+def _load_generation(session):
+    path = _session_path(session)
+    if path is None:
+        return None
+    try:
+        with open(path, encoding="utf8") as f:
+            return json.load(f)["generation"]
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        return None
+
+
+def _save_generation(session, key):
+    path = _session_path(session)
+    if path is None:
+        return None
+    generation = uuid.uuid4().hex
+    content = json.dumps({"key": key, "generation": generation})
+
+    def write(path):
+        with open(path, "w", encoding="utf8") as f:
+            f.write(content)
+
+    os.makedirs(PRERENDERS_DIR, exist_ok=True)
+    evict_least_recently_used(PRERENDERS_DIR, MAX_PRERENDERS_ON_DISK_MB)
+    write_atomically(path, write)
+    return generation
+
+
+def _still_wanted(requests):
+    # a session which loaded another location since has a new generation
+    return any(
+        generation is None or _load_generation(session) == generation
+        for session, generation in requests
+    )
+
+
+def _prerender(key, requests):
+    try:
+        df = get_dataset(key)
+        if df is None:
+            return
+        with app.server.app_context():
+            for chart, args, derived in list(default_figures):
+                with _lock:
+                    if not _still_wanted(requests):
+                        del _prerenders[key]
+                        return
+                cache_key = figure_key(key, chart, args)
+                if cache.get(cache_key) is not None:
+                    continue
+                try:
+                    cache.set(cache_key, _render(key, df.copy(), chart, args, derived))
+                except Exception as e:
+                    # e.g. a variable missing from the EPW, the tab reports it
+                    print(f"Could not pre-render {chart.__qualname__}{args}: {e}")
+    finally:
+        with _lock:
+            if _prerenders.get(key) is requests:
+                del _prerenders[key]
+
+
+def prerender_figures(key, session=None):
+    """Render the default figures of the dataset key in the background.
+
+    The figures are rendered one after the other by a pool of threads, those
+    already cached are skipped. Nothing is started if the dataset is already
+    being pre-rendered by this worker. Returns the future of the job, or None.
+
+    The load is recorded for the browser session, see new_session, in
+    PRERENDERS_DIR. When the session loads another location the job stops
+    after the figure being rendered, in whichever worker it runs, unless
+    other sessions are still waiting for the same dataset.
+    """
+    generation = _save_generation(session, key)
+    with _lock:
+        if key in _prerenders:
+            _prerenders[key].append((session, generation))
+            return None
+        requests = _prerenders[key] = [(session, generation)]
+    return _prerender_pool.submit(_prerender, key, requests)
@@ -1,58 +1,194 @@
+import argparse
+import glob
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from xml.etree import ElementTree
+
 import pandas as pd
+from my_project.station_catalog import (
+    CATALOG_PATH,
+    catalog_dtypes,
+    source_energy_plus,
+    source_one_building,
+)
 from my_project.utils import code_timer
-import re
+
+
+def _file_id(url):
+    """Return the name of the downloaded file without extension."""
+    return os.path.splitext(url.rstrip("/").split("/")[-1])[0]
+
+
+def _wmo(text):
+    wmo = re.search(r"\.(\d{6})_", text)
+    return wmo.group(1) if wmo else ""
+
+
+def _local_name(tag):
+    """Return the tag without its XML namespace."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _placemark_station(placemark):
+    """Return the catalog row of a Climate.OneBuilding placemark."""
+    fields = {_local_name(child.tag): child for child in placemark.iter()}
+    description = fields["description"].text
+    url = re.search(r"<td>URL (.+?)<\/td>", description).group(1)
+    lon, lat = fields["coordinates"].text.strip().split(",")[:2]
+    period = re.search(r"Period of Record=([\d-]+)", description)
+    wmo = re.search(r"WMO <b>(\d+)<\/b>", description)
+    return {
+        "id": _file_id(url),
+        "name": fields["name"].text.strip(),
+        "lat": float(lat),
+        "lon": float(lon),
+        "source": source_one_building,
+        "url": url,
+        "period": period.group(1) if period else "",
+        "wmo": wmo.group(1) if wmo else _wmo(url),
+    }
 
 
 @code_timer
 def import_kml_files(file_name):
-    with open(f"./assets/data/{file_name}.kml", encoding="utf8") as data:
-        text = data.read()
+    """Return the Climate.OneBuilding stations listed in a KML file.
+
+    The file is parsed as a stream and each placemark is discarded once read,
+    so the memory used does not grow with the size of the file.
+    """
+    data = []
+    parents = []
+    for event, element in ElementTree.iterparse(
+        f"./assets/data/{file_name}.kml", events=("start", "end")
+    ):
+        if event == "start":
+            parents.append(element)
+            continue
+        parents.pop()
+        if _local_name(element.tag) == "Placemark":
+            data.append(_placemark_station(element))
+            parents[-1].remove(element)
+
+    return pd.DataFrame(data, columns=list(catalog_dtypes))
 
-    locations = re.findall(r"<Placemark>[\s\S]*?<\/Placemark>", text)
+
+def import_energy_plus_locations():
+    """Return the EnergyPlus stations listed in epw_location.json."""
+    with open("./assets/data/epw_location.json", encoding="utf8") as data_file:
+        features = json.load(data_file)["features"]
 
     data = []
-    for location in locations:
-        # print(location)
-        location_info = []
-        # lat
-        location_info.append(
-            re.findall(r"<coordinates>(.+?)<\/coordinates>", location)[0].split(",")[0]
-        )
-        # long
-        location_info.append(
-            re.findall(r"<coordinates>(.+?)<\/coordinates>", location)[0].split(",")[1]
-        )
-        # name
-        location_info.append(re.findall(r"<name>(.+?)<\/name>", location)[0])
-        # url
-        location_info.append(
-            "<a href="
-            + re.findall(r"<td>URL (.+?)<\/td>", location)[0]
-            + ' style="color: #fff">Climate.OneBuilding.Org</a>'
+    for feature in features:
+        url = re.search(r"href=[\'\"]?([^\'\" >]+)", feature["properties"]["epw"])
+        lon, lat = feature["geometry"]["coordinates"]
+        data.append(
+            {
+                "id": _file_id(url.group(1)),
+                "name": feature["properties"]["title"],
+                "lat": lat,
+                "lon": lon,
+                "source": source_energy_plus,
+                "url": url.group(1),
+                "period": "",
+                "wmo": _wmo(url.group(1)),
+            }
         )
 
-        data.append(location_info)
+    return pd.DataFrame(data, columns=list(catalog_dtypes))
 
-    df = pd.DataFrame(data, columns=["lon", "lat", "name", "Source"])
 
+def read_station_catalog():
+    """Return the station catalog on disk with plain columns, empty if missing."""
+    dtype = {**catalog_dtypes, "source": str, "period": str}
     try:
-        df_old = pd.read_csv(f"./assets/data/one_building.csv")
-        df_old = df_old.append(df).drop_duplicates()
-        df_old.to_csv(f"./assets/data/one_building.csv", index=False)
+        return pd.read_csv(
+            CATALOG_PATH,
+            dtype=dtype,
+            keep_default_na=False,
+            na_values={"lat": [""], "lon": [""]},
+        )
     except FileNotFoundError:
-        df.to_csv(f"./assets/data/one_building.csv", index=False)
+        return pd.DataFrame(columns=list(catalog_dtypes)).astype(dtype)
+
+
+def merge_stations(catalog, stations):
+    """Return the catalog with the stations updated or, if new, appended.
+
+    Stations are matched by source and id, the same file can be published by
+    both EnergyPlus and Climate.OneBuilding. Updated stations keep their row.
+    """
+    key = ["source", "id"]
+    stations = stations.drop_duplicates(subset=key, keep="last").set_index(key)
+    catalog = catalog.set_index(key)
+    catalog = pd.concat(
+        [catalog, stations.loc[~stations.index.isin(catalog.index)]]
+    ).astype(catalog.dtypes.to_dict())
+    catalog.loc[stations.index] = stations
+    return catalog.reset_index()[list(catalog_dtypes)]
+
+
+@code_timer
+def build_station_catalog(kml_files=None, energy_plus=True, processes=1, rebuild=False):
+    """Merge the stations of epw_location.json and of the KML files in the catalog.
+
+    By default all the KML files in assets/data are imported, processes larger
+    than one imports them in parallel. The stations already in the catalog are
+    kept unless rebuild is True.
+    """
+    if kml_files is None:
+        kml_files = [
+            os.path.splitext(os.path.basename(file))[0]
+            for file in sorted(
+                glob.glob("./assets/data/*_EPW_Processing_locations.kml")
+            )
+        ]
+
+    stations = [import_energy_plus_locations()] if energy_plus else []
+    if processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            stations += executor.map(import_kml_files, kml_files)
+    else:
+        stations += map(import_kml_files, kml_files)
+
+    catalog = read_station_catalog()
+    if rebuild:
+        catalog = catalog.iloc[0:0]
+    catalog = merge_stations(catalog, pd.concat(stations, ignore_index=True))
+    catalog.to_csv(CATALOG_PATH, index=False)
+    print(f"{len(catalog)} stations in {CATALOG_PATH}")
 
 
 if __name__ == "__main__":
 
-    import_kml_files("Region1_Africa_EPW_Processing_locations")
-    import_kml_files("Region7_Antarctica_EPW_Processing_locations")
-    import_kml_files("Region3_South_America_EPW_Processing_locations")
-    import_kml_files("Region2_Region6_Russia_EPW_Processing_locations")
-    import_kml_files("Region2_Asia_EPW_Processing_locations")
-    import_kml_files("Region4_CaliforniaClimateZones_EPW_Processing_locations")
-    import_kml_files("Region4_NA_CA_Caribbean_EPW_Processing_locations")
-    import_kml_files("Region4_USA_EPW_Processing_locations")
-    import_kml_files("Region4_Canada_EPW_Processing_locations")
-    import_kml_files("Region6_Europe_EPW_Processing_locations")
-    import_kml_files("Region5_Southwest_Pacific_EPW_Processing_locations")
+    parser = argparse.ArgumentParser(
+        description="Update the station catalog with new EnergyPlus and "
+        "Climate.OneBuilding files."
+    )
+    parser.add_argument(
+        "kml_files",
+        nargs="*",
+        help="names of the KML files in assets/data to import, all if not given",
+    )
+    parser.add_argument(
+        "--skip-energy-plus",
+        action="store_true",
+        help="do not import epw_location.json",
+    )
+    parser.add_argument(
+        "--processes", type=int, default=1, help="KML files imported in parallel"
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="drop the stations that are not in the imported files",
+    )
+    args = parser.parse_args()
+
+    build_station_catalog(
+        kml_files=args.kml_files or None,
+        energy_plus=not args.skip_energy_plus,
+        processes=args.processes,
+        rebuild=args.rebuild,
+    )
@@ -0,0 +1,76 @@
+import functools
+
+import numpy as np
+
+# built by build_koppen_geiger.build_koppen_geiger_grid
+GRID_PATH = "./assets/data/koppen_geiger.npz"
+# cells (5 arc minutes each) searched around a location in the sea, weather
+# stations are often on the coast or on islands too small for the grid
+COAST_SEARCH_CELLS = 6
+
+zone_descriptions = {
+    "Af": "Tropical rainforest climate",
+    "Am": "Tropical monsoon climate",
+    "As": "Tropical savanna climate with dry summer",
+    "Aw": "Tropical savanna climate with dry winter",
+    "BWh": "Hot desert climate",
+    "BWk": "Cold desert climate",
+    "BSh": "Hot semi-arid climate",
+    "BSk": "Cold semi-arid climate",
+    "Csa": "Hot-summer Mediterranean climate",
+    "Csb": "Warm-summer Mediterranean climate",
+    "Csc": "Cold-summer Mediterranean climate",
+    "Cwa": "Monsoon-influenced humid subtropical climate",
+    "Cwb": "Subtropical highland climate with dry winter",
+    "Cwc": "Cold subtropical highland climate with dry winter",
+    "Cfa": "Humid subtropical climate",
+    "Cfb": "Temperate oceanic climate",
+    "Cfc": "Subpolar oceanic climate",
+    "Dsa": "Hot-summer humid continental climate with dry summer",
+    "Dsb": "Warm-summer humid continental climate with dry summer",
+    "Dsc": "Subarctic climate with dry summer",
+    "Dsd": "Extremely cold subarctic climate with dry summer",
+    "Dwa": "Monsoon-influenced hot-summer humid continental climate",
+    "Dwb": "Monsoon-influenced warm-summer humid continental climate",
+    "Dwc": "Monsoon-influenced subarctic climate",
+    "Dwd": "Monsoon-influenced extremely cold subarctic climate",
+    "Dfa": "Hot-summer humid continental climate",
+    "Dfb": "Warm-summer humid continental climate",
+    "Dfc": "Subarctic climate",
+    "Dfd": "Extremely cold subarctic climate",
+    "ET": "Tundra climate",
+    "EF": "Ice cap climate",
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _load_grid():
+    """Return the grid of the zones, from north to south and west to east."""
+    with np.load(GRID_PATH) as grid:
+        return grid["zones"], grid["codes"].tolist()
+
+
+def climate_zone(lat, lon):
+    """Return the Köppen–Geiger climate zone at lat, lon, None in the open sea.
+
+    The zone is read from a grid bundled with the app. Locations in the sea
+    take the zone of the closest land cell within COAST_SEARCH_CELLS cells.
+    """
+    zones, codes = _load_grid()
+    rows, columns = zones.shape
+    row = min(max(int((90 - float(lat)) * rows / 180), 0), rows - 1)
+    column = int((float(lon) + 180) * columns / 360) % columns
+
+    zone = zones[row, column]
+    if zone == 0:
+        offsets = np.arange(-COAST_SEARCH_CELLS, COAST_SEARCH_CELLS + 1)
+        near_rows = np.clip(row + offsets, 0, rows - 1)
+        near_columns = (column + offsets) % columns
+        near = zones[np.ix_(near_rows, near_columns)]
+        land = np.argwhere(near > 0)
+        if len(land) == 0:
+            return None
+        distance = ((land - COAST_SEARCH_CELLS) ** 2).sum(axis=1)
+        zone = near[tuple(land[distance.argmin()])]
+
+    return codes[zone]
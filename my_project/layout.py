@@ -216,5 +216,10 @@ def store():
             dcc.Store(id="df-store", storage_type="session"),
             dcc.Store(id="meta-store", storage_type="session"),
             dcc.Store(id="url-store", storage_type="session"),
+            # id of the browser session, see figure_cache.prerender_figures
+            dcc.Store(id="session-store", storage_type="session"),
+            # job processing the EPW being loaded, see epw_jobs
+            dcc.Store(id="epw-job-store"),
+            dcc.Interval(id="epw-job-interval", interval=500, disabled=True),
         ],
     )
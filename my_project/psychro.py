@@ -0,0 +1,123 @@
+import numpy as np
+
+c_to_k = 273.15
+cp_vapour = 1805.0
+cp_air = 1004
+h_fg = 2501000
+
+
+def p_sat(tdb):
+    """Return the saturation vapour pressure [Pa] for an array of temperatures.
+
+    Array version of pythermalcomfort.psychrometrics.p_sat.
+    """
+    ta_k = np.asarray(tdb, dtype=float) + c_to_k
+
+    # over ice
+    c1 = -5674.5359
+    c2 = 6.3925247
+    c3 = -0.9677843e-2
+    c4 = 0.62215701e-6
+    c5 = 0.20747825e-8
+    c6 = -0.9484024e-12
+    c7 = 4.1635019
+    # over liquid water
+    c8 = -5800.2206
+    c9 = 1.3914993
+    c10 = -0.048640239
+    c11 = 0.41764768e-4
+    c12 = -0.14452093e-7
+    c13 = 6.5459673
+
+    log_ta_k = np.log(ta_k)
+    pascals = np.where(
+        ta_k < c_to_k,
+        np.exp(
+            c1 / ta_k
+            + c2
+            + ta_k * (c3 + ta_k * (c4 + ta_k * (c5 + c6 * ta_k)))
+            + c7 * log_ta_k
+        ),
+        np.exp(
+            c8 / ta_k + c9 + ta_k * (c10 + ta_k * (c11 + ta_k * c12)) + c13 * log_ta_k
+        ),
+    )
+
+    return np.round(pascals, 1)
+
+
+def t_wb(tdb, rh):
+    """Return the wet bulb temperature [°C] using the Stull equation.
+
+    Array version of pythermalcomfort.psychrometrics.t_wb.
+    """
+    tdb = np.asarray(tdb, dtype=float)
+    rh = np.asarray(rh, dtype=float)
+    twb = (
+        tdb * np.arctan(0.151977 * (rh + 8.313659) ** (1 / 2))
+        + np.arctan(tdb + rh)
+        - np.arctan(rh - 1.676331)
+        + 0.00391838 * rh ** (3 / 2) * np.arctan(0.023101 * rh)
+        - 4.686035
+    )
+    return np.round(twb, 1)
+
+
+def t_dp(tdb, rh):
+    """Return the dew point temperature [°C].
+
+    Array version of pythermalcomfort.psychrometrics.t_dp, a relative humidity
+    of zero returns -inf instead of raising.
+    """
+    tdb = np.asarray(tdb, dtype=float)
+    rh = np.asarray(rh, dtype=float)
+    c = 257.14
+    b = 18.678
+    d = 234.5
+
+    with np.errstate(divide="ignore"):
+        gamma_m = np.log(rh / 100 * np.exp((b - tdb / d) * (tdb / (c + tdb))))
+
+    return np.round(c * gamma_m / (b - gamma_m), 1)
+
+
+def enthalpy(tdb, hr):
+    """Return the air enthalpy [J/kg dry air].
+
+    Array version of pythermalcomfort.psychrometrics.enthalpy.
+    """
+    tdb = np.asarray(tdb, dtype=float)
+    h_dry_air = cp_air * tdb
+    h_sat_vap = h_fg + cp_vapour * tdb
+    return np.round(h_dry_air + hr * h_sat_vap, 2)
+
+
+def psy_ta_rh(tdb, rh, patm=101325):
+    """Return the psychrometric values of moist air from tdb [°C] and rh [%].
+
+    Array version of pythermalcomfort.psychrometrics.psy_ta_rh, tdb and rh are
+    broadcast against each other and all the values are computed in one pass.
+
+    Returns
+    -------
+    dict
+        arrays of saturation vapour pressure "p_sat" [Pa], partial pressure of
+        water vapour "p_vap" [Pa], humidity ratio "hr" [kg water/kg dry air],
+        wet bulb temperature "t_wb" [°C], dew point temperature "t_dp" [°C] and
+        enthalpy "h" [J/kg dry air]
+    """
+    tdb, rh = np.broadcast_arrays(
+        np.asarray(tdb, dtype=float), np.asarray(rh, dtype=float)
+    )
+    p_saturation = p_sat(tdb)
+    p_vap = rh / 100 * p_saturation
+    hr = 0.62198 * p_vap / (patm - p_vap)
+
+    return {
+        "p_sat": p_saturation,
+        "p_vap": p_vap,
+        "hr": hr,
+        "t_wb": t_wb(tdb, rh),
+        "t_dp": t_dp(tdb, rh),
+        "h": enthalpy(tdb, hr),
+    }
@@ -0,0 +1,197 @@
+import hashlib
+import os
+import pickle
+import shutil
+import threading
+import time
+from collections import Counter
+
+from flask_caching import Cache
+from flask_caching.backends.base import BaseCache
+
+from my_project.utils import evict_least_recently_used, touch_file, write_atomically
+
+
+class SharedFileSystemCache(BaseCache):
+    """Flask-Caching backend shared by all the workers through files on disk.
+
+    Each value is pickled in its own file of directory, named after the hash of
+    its key and written atomically, so a value computed by one worker is read by
+    all the others. The least recently used files are deleted when directory is
+    larger than max_size_mb, checked every evict_every values set. key_prefix
+    is prepended to all the keys, e.g. to tell apart the versions of the app.
+    """
+
+    def __init__(
+        self,
+        directory,
+        default_timeout=300,
+        max_size_mb=1024,
+        evict_every=20,
+        key_prefix="",
+    ):
+        super().__init__(default_timeout)
+        self.directory = directory
+        self.key_prefix = key_prefix
+        self.max_size_mb = max_size_mb
+        self.evict_every = evict_every
+        self._stats = Counter()
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        kwargs.update(
+            max_size_mb=config.get("CACHE_MAX_SIZE_MB", 1024),
+            key_prefix=config.get("CACHE_KEY_PREFIX") or "",
+        )
+        return cls(config["CACHE_DIR"], *args, **kwargs)
+
+    def _path(self, key):
+        key = self.key_prefix + key
+        return os.path.join(
+            self.directory, hashlib.sha1(key.encode()).hexdigest() + ".pkl"
+        )
+
+    def _count(self, stat, n=1):
+        with self._lock:
+            self._stats[stat] += n
+
+    def _read(self, key):
+        """Return whether key is cached and not expired, and its value."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                expires, value = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return False, None
+
+        if expires and expires < time.time():
+            self._count("expired")
+            self._remove(path)
+            return False, None
+        touch_file(path)
+        return True, value
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def get(self, key):
+        found, value = self._read(key)
+        self._count("hits" if found else "misses")
+        return value
+
+    def has(self, key):
+        return self._read(key)[0]
+
+    def set(self, key, value, timeout=None):
+        timeout = self._normalize_timeout(timeout)
+        expires = time.time() + timeout if timeout else 0
+
+        def write(path):
+            with open(path, "wb") as f:
+                pickle.dump((expires, value), f, pickle.HIGHEST_PROTOCOL)
+
+        write_atomically(self._path(key), write)
+        self._count("sets")
+        if self._stats["sets"] % self.evict_every == 0:
+            self._count(
+                "evictions",
+                evict_least_recently_used(self.directory, self.max_size_mb),
+            )
+        return True
+
+    def add(self, key, value, timeout=None):
+        if self.has(key):
+            return False
+        return self.set(key, value, timeout)
+
+    def delete(self, key):
+        return self._remove(self._path(key))
+
+    def clear(self):
+        for entry in os.scandir(self.directory):
+            if entry.is_file():
+                self._remove(entry.path)
+        return True
+
+    def stats(self):
+        """Return the statistics of the cache.
+
+        Hits, misses, sets, evictions and expired values are counted by each
+        worker, the entries and their size on disk are shared by all of them.
+        """
+        sizes = [
+            entry.stat().st_size
+            for entry in os.scandir(self.directory)
+            if entry.is_file() and not entry.name.endswith(".tmp")
+        ]
+        with self._lock:
+            stats = {
+                stat: self._stats[stat]
+                for stat in ("hits", "misses", "sets", "evictions", "expired")
+            }
+        return {**stats, "entries": len(sizes), "size_mb": sum(sizes) / 1024**2}
+
+
+def remove_other_versions(directory):
+    """Delete the directories and files next to directory, left by other versions.
+
+    Call it at startup with a cache directory named after the version of the
+    app, the values cached by the previous versions are never read again.
+    """
+    parent, name = os.path.split(os.path.normpath(directory))
+    try:
+        entries = list(os.scandir(parent))
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        if entry.name == name:
+            continue
+        if entry.is_dir():
+            shutil.rmtree(entry.path, ignore_errors=True)
+        else:
+            SharedFileSystemCache._remove(entry.path)
+
+
+class NamespacedCache(Cache):
+    """Cache whose values are kept for the timeout of their namespace.
+
+    CACHE_NAMESPACE_TIMEOUTS maps namespaces, prefixes of the keys set or of
+    the module of the memoized functions, to the timeout of their values. It
+    takes precedence over the timeout given, the longest matching prefix wins.
+    """
+
+    def init_app(self, app, config=None):
+        super().init_app(app, config)
+        namespaces = {**app.config, **(self.config or {}), **(config or {})}.get(
+            "CACHE_NAMESPACE_TIMEOUTS", {}
+        )
+        self.namespace_timeouts = sorted(
+            namespaces.items(), key=lambda item: -len(item[0])
+        )
+
+    def namespace_timeout(self, name, timeout=None):
+        """Return the timeout of the namespace of name, timeout if it has none."""
+        for namespace, namespace_timeout in self.namespace_timeouts:
+            if name.startswith(namespace):
+                return namespace_timeout
+        return timeout
+
+    def set(self, key, value, timeout=None):
+        return super().set(key, value, self.namespace_timeout(key, timeout))
+
+    def add(self, key, value, timeout=None):
+        return super().add(key, value, self.namespace_timeout(key, timeout))
+
+    def memoize(self, timeout=None, **kwargs):
+        def decorator(f):
+            memoize = super(NamespacedCache, self).memoize
+            return memoize(self.namespace_timeout(f.__module__, timeout), **kwargs)(f)
+
+        return decorator
@@ -0,0 +1,93 @@
+import os
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+import pandas as pd
+from pvlib import solarposition
+
+from my_project.utils import evict_least_recently_used, touch_file, write_atomically
+
+SOLAR_POSITIONS_DIR = "./cache-directory/solar_positions"
+MAX_SOLAR_POSITIONS_IN_MEMORY = 64
+MAX_SOLAR_POSITIONS_ON_DISK_MB = 256
+# a hundredth of a degree is about 1 km, the sun moves by less than 0.01 degrees
+COORDINATES_DECIMALS = 2
+# bump when the calculation changes so that the positions saved before are ignored
+SOLAR_POSITIONS_VERSION = 1
+
+_positions = OrderedDict()
+_lock = threading.Lock()
+
+
+def _location(latitude, longitude, time_zone):
+    """Return the rounded location used both as cache key and for the calculation."""
+    return (
+        round(float(latitude), COORDINATES_DECIMALS),
+        round(float(longitude), COORDINATES_DECIMALS),
+        float(time_zone),
+    )
+
+
+def _keep_in_memory(key, solar_position):
+    with _lock:
+        _positions[key] = solar_position
+        _positions.move_to_end(key)
+        while len(_positions) > MAX_SOLAR_POSITIONS_IN_MEMORY:
+            _positions.popitem(last=False)
+
+
+def _cached(key, compute):
+    """Return compute() saved under key, in memory first and then on disk."""
+    key = f"v{SOLAR_POSITIONS_VERSION}_{key}"
+    with _lock:
+        solar_position = _positions.get(key)
+        if solar_position is not None:
+            _positions.move_to_end(key)
+
+    if solar_position is None:
+        path = os.path.join(SOLAR_POSITIONS_DIR, f"{key}.pkl")
+        try:
+            solar_position = pd.read_pickle(path)
+            touch_file(path)
+        except (FileNotFoundError, EOFError):
+            solar_position = compute()
+            write_atomically(path, solar_position.to_pickle)
+            evict_least_recently_used(
+                SOLAR_POSITIONS_DIR, MAX_SOLAR_POSITIONS_ON_DISK_MB
+            )
+        _keep_in_memory(key, solar_position)
+
+    return solar_position.copy()
+
+
+def hourly_solar_position(latitude, longitude, time_zone):
+    """Return the solar position for each hour of the year used by create_df.
+
+    The times are those of the EPW records, in the local standard time of
+    time_zone. Locations are rounded to COORDINATES_DECIMALS, so the different
+    EPW files of a station share the same result.
+    """
+    latitude, longitude, time_zone = _location(latitude, longitude, time_zone)
+
+    def compute():
+        times = pd.date_range(
+            "2019-01-01 00:00:00", "2020-01-01", closed="left", freq="H", tz="UTC"
+        )
+        times = times - timedelta(days=0, hours=time_zone - 1, minutes=0)
+        return solarposition.get_solarposition(times, latitude, longitude)
+
+    return _cached(f"hourly_{latitude}_{longitude}_{time_zone}", compute)
+
+
+def daily_solar_position(date, latitude, longitude, time_zone):
+    """Return the solar position every 5 minutes during date, used for sun paths."""
+    latitude, longitude, time_zone = _location(latitude, longitude, time_zone)
+    date = pd.Timestamp(date)
+
+    def compute():
+        times = pd.date_range(date, date + pd.Timedelta("24h"), freq="5min", tz="UTC")
+        times = times - timedelta(days=0, hours=time_zone - 1, minutes=0)
+        return solarposition.get_solarposition(times, latitude, longitude)
+
+    return _cached(f"daily_{date:%Y%m%d}_{latitude}_{longitude}_{time_zone}", compute)
@@ -0,0 +1,278 @@
+import bisect
+import functools
+import re
+from itertools import product
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+# built by import_one_building_files.build_station_catalog
+CATALOG_PATH = "./assets/data/stations.csv.gz"
+catalog_dtypes = {
+    "id": str,
+    "name": str,
+    "lat": float,
+    "lon": float,
+    "source": "category",
+    "url": str,
+    "period": "category",
+    "wmo": str,
+}
+source_energy_plus = "EnergyPlus"
+source_one_building = "Climate.OneBuilding.Org"
+earth_radius_km = 6371.0
+# size of the cells of the grid index used to find the stations in a map view
+GRID_CELL_DEG = 1.0
+# size of the clusters of stations at zoom 0, halved at each zoom level
+CLUSTER_CELL_DEG = 45.0
+# minimum share of trigrams in common with a misspelled word of a search
+FUZZY_MIN_SIMILARITY = 0.3
+
+
+@functools.lru_cache(maxsize=None)
+def load_station_catalog():
+    """Return the catalog of the weather stations, read only once.
+
+    One row per EPW file available for download with its id (the name of the
+    file, which may be published by more than one source), station name,
+    latitude, longitude, source, url, period of record and WMO number. The
+    catalog is shared, do not modify it.
+    """
+    return pd.read_csv(
+        CATALOG_PATH,
+        dtype=catalog_dtypes,
+        keep_default_na=False,
+        na_values={"lat": [""], "lon": [""]},
+    )
+
+
+def _unit_vectors(lat, lon):
+    """Return the points on the unit sphere at the latitudes and longitudes."""
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lon = np.radians(np.asarray(lon, dtype=float))
+    return np.stack(
+        (np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)), axis=-1
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _station_tree():
+    """Return the KD-tree of the stations of the catalog, built only once."""
+    catalog = load_station_catalog()
+    return cKDTree(_unit_vectors(catalog["lat"], catalog["lon"]))
+
+
+def nearest_stations(lat, lon, n=5):
+    """Return the n stations closest to lat, lon, sorted by distance.
+
+    The stations are found with a KD-tree over their positions on the unit
+    sphere, where the straight line distance grows with the great circle one.
+    The rows of the catalog are returned with their great circle "distance" in
+    km, the index of the returned dataframe is the position in the catalog.
+    """
+    catalog = load_station_catalog()
+    n = min(int(n), len(catalog))
+    chord, index = _station_tree().query(
+        _unit_vectors(lat, lon), k=list(range(1, n + 1))
+    )
+    distance = 2 * np.arcsin(np.minimum(chord / 2, 1)) * earth_radius_km
+    return catalog.iloc[index].assign(distance=distance)
+
+
+@functools.lru_cache(maxsize=None)
+def _station_grid():
+    """Return the positions in the catalog of the stations in each grid cell."""
+    catalog = load_station_catalog()
+    cells = [
+        np.floor(catalog["lat"] / GRID_CELL_DEG).astype(int),
+        np.floor(catalog["lon"] / GRID_CELL_DEG).astype(int),
+    ]
+    return catalog.groupby(cells).indices
+
+
+def _lon_ranges(west, east):
+    """Split the longitudes from west to east, which may cross 180, in ranges."""
+    width = east - west
+    if width >= 360:
+        return [(-180, 180)]
+    west = (west + 180) % 360 - 180
+    east = west + width
+    if east > 180:
+        return [(west, 180), (-180, east - 360)]
+    return [(west, east)]
+
+
+def inside_bounds(df, west, south, east, north):
+    """Return the mask of the rows of df whose "lat" and "lon" are in the bounds."""
+    return df["lat"].between(south, north) & np.any(
+        [df["lon"].between(start, end) for start, end in _lon_ranges(west, east)],
+        axis=0,
+    )
+
+
+def stations_in_bounds(west, south, east, north):
+    """Return the stations of the catalog inside the bounds, in degrees.
+
+    The candidates are read from a grid index of GRID_CELL_DEG cells, then
+    filtered exactly. Bounds crossing the antimeridian have east > 180 or a
+    west lower than -180, as in the maps. The index of the returned dataframe
+    is the position in the catalog.
+    """
+    catalog = load_station_catalog()
+    grid = _station_grid()
+    lon_ranges = _lon_ranges(west, east)
+    rows = range(int(np.floor(south / GRID_CELL_DEG)), int(north // GRID_CELL_DEG) + 1)
+    columns = [
+        column
+        for start, end in lon_ranges
+        for column in range(
+            int(np.floor(start / GRID_CELL_DEG)), int(end // GRID_CELL_DEG) + 1
+        )
+    ]
+    if len(rows) * len(columns) < len(grid):
+        cells = [grid[cell] for cell in product(rows, columns) if cell in grid]
+        positions = np.sort(np.concatenate(cells)) if cells else np.array([], int)
+    else:
+        positions = np.arange(len(catalog))
+
+    stations = catalog.iloc[positions]
+    return stations.loc[inside_bounds(stations, west, south, east, north)]
+
+
+@functools.lru_cache(maxsize=None)
+def station_clusters(zoom):
+    """Return the stations grouped in clusters to be shown at a map zoom level.
+
+    The clusters are the cells of a grid halving at each zoom level, starting
+    from CLUSTER_CELL_DEG at zoom 0. Each row has the mean "lat" and "lon" of
+    the stations of the cluster, their "count" and the "position" in the
+    catalog of one of them. The clusters are shared, do not modify them.
+    """
+    catalog = load_station_catalog()
+    cell = CLUSTER_CELL_DEG / 2 ** int(zoom)
+    clusters = (
+        catalog[["lat", "lon"]]
+        .assign(position=np.arange(len(catalog)))
+        .groupby(
+            [np.floor(catalog["lat"] / cell), np.floor(catalog["lon"] / cell)],
+        )
+        .agg(
+            lat=("lat", "mean"),
+            lon=("lon", "mean"),
+            count=("position", "size"),
+            position=("position", "first"),
+        )
+    )
+    return clusters.reset_index(drop=True)
+
+
+def _words(text):
+    """Return the lower case words and numbers in text, split at any symbol."""
+    return re.findall(r"[^\W_]+", text.lower())
+
+
+def _trigrams(word):
+    padded = f"  {word} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+@functools.lru_cache(maxsize=None)
+def _search_index():
+    """Return the index used by search_stations, built only once.
+
+    The words of the names and WMO numbers of the stations are sorted, with
+    the positions in the catalog of the stations of each word stored one after
+    the other in a single array, so the stations of all the words starting with
+    a prefix are a slice of it. Each trigram lists the words it is part of.
+    """
+    catalog = load_station_catalog()
+    stations_of_word = {}
+    for position, (name, wmo) in enumerate(zip(catalog["name"], catalog["wmo"])):
+        for word in set(_words(name)) | {wmo}:
+            stations_of_word.setdefault(word, []).append(position)
+    stations_of_word.pop("", None)
+
+    words = sorted(stations_of_word)
+    positions = [stations_of_word[word] for word in words]
+    offsets = np.cumsum([0] + [len(stations) for stations in positions])
+
+    words_of_trigram = {}
+    for word_id, word in enumerate(words):
+        for trigram in _trigrams(word):
+            words_of_trigram.setdefault(trigram, []).append(word_id)
+
+    return {
+        "words": words,
+        "offsets": offsets,
+        "positions": np.concatenate(positions),
+        "trigrams": {
+            trigram: np.array(ids) for trigram, ids in words_of_trigram.items()
+        },
+        "trigram_counts": np.array([len(_trigrams(word)) for word in words]),
+        "name_lengths": catalog["name"].str.len().to_numpy(),
+    }
+
+
+def _word_matches(index, word):
+    """Return the positions of the stations matching a searched word and scores.
+
+    A station scores 3 if it has the word, 2 if it has a word starting with it
+    and the share of trigrams in common with the most similar word otherwise.
+    """
+    words, offsets = index["words"], index["offsets"]
+    start = bisect.bisect_left(words, word)
+    end = bisect.bisect_left(words, word + "\uffff", lo=start)
+    if start < end:
+        exact = words[start] == word
+        positions = index["positions"][offsets[start] : offsets[end]]
+        scores = np.full(len(positions), 2.0)
+        scores[: offsets[start + 1] - offsets[start]] += exact
+    else:
+        trigrams = _trigrams(word)
+        shared = np.bincount(
+            np.concatenate(
+                [index["trigrams"].get(trigram, []) for trigram in trigrams]
+                + [np.array([], int)]
+            ).astype(int),
+            minlength=len(words),
+        )
+        similarity = shared / (len(trigrams) + index["trigram_counts"] - shared)
+        similar = np.flatnonzero(similarity >= FUZZY_MIN_SIMILARITY)
+        positions = np.concatenate(
+            [index["positions"][offsets[i] : offsets[i + 1]] for i in similar]
+            + [np.array([], int)]
+        )
+        scores = np.repeat(similarity[similar], np.diff(offsets)[similar])
+
+    # keep the best score of each station
+    order = np.argsort(-scores, kind="stable")
+    positions, first = np.unique(positions[order], return_index=True)
+    return positions, scores[order][first]
+
+
+def search_stations(query, n=10):
+    """Return the n stations of the catalog best matching the searched text.
+
+    Every word of query has to match a word of the station name or its WMO
+    number, either whole, as a prefix or, if no word starts with it, as a
+    similar word. The stations are sorted by score and then by name length,
+    the index of the returned dataframe is the position in the catalog.
+    """
+    catalog = load_station_catalog()
+    index = _search_index()
+    positions, scores = None, None
+    for word in set(_words(query)):
+        word_positions, word_scores = _word_matches(index, word)
+        if positions is None:
+            positions, scores = word_positions, word_scores
+        else:
+            positions, i, j = np.intersect1d(
+                positions, word_positions, assume_unique=True, return_indices=True
+            )
+            scores = scores[i] + word_scores[j]
+    if positions is None:
+        return catalog.iloc[0:0]
+
+    best = np.lexsort((index["name_lengths"][positions], -scores))[:n]
+    return catalog.iloc[positions[best]]
@@ -24,8 +24,15 @@ from my_project.tab_data_explorer.charts_data_explorer import (
     two_var_graph,
     three_var_graph,
 )
-from my_project.template_graphs import heatmap, yearly_profile, daily_profile, barchart
-import pandas as pd
+from my_project.template_graphs import (
+    barchart,
+    daily_profile,
+    get_ashrae,
+    heatmap,
+    yearly_profile,
+)
+from my_project.dataset_registry import load_dataset
+from my_project.figure_cache import default_figure, load_figure
 
 from app import app, cache, TIMEOUT
 
@@ -552,7 +559,8 @@ def layout_data_explorer():
 @cache.memoize(timeout=TIMEOUT)
 def update_tab_yearly(var, global_local, df, meta):
     """Update the contents of tab size. Passing in the info from the dropdown and the general info."""
-    df = pd.read_json(df, orient="split")
+    key = df
+    df = load_dataset(key)
     if df[var].mean() == 99990.0:
         return dbc.Alert(
             """The selected variable is not available,
@@ -563,7 +571,9 @@ def update_tab_yearly(var, global_local, df, meta):
     else:
         return dcc.Graph(
             config=generate_chart_name("yearly_explore", meta),
-            figure=yearly_profile(df, var, global_local),
+            figure=load_figure(
+                key, yearly_profile, var, global_local, ashrae=get_ashrae
+            ),
         )
 
 
@@ -575,11 +585,10 @@ def update_tab_yearly(var, global_local, df, meta):
 @cache.memoize(timeout=TIMEOUT)
 def update_tab_daily(var, global_local, df, meta):
     """Update the contents of tab size. Passing in the info from the dropdown and the general info."""
-    df = pd.read_json(df, orient="split")
     return (
         dcc.Graph(
             config=generate_chart_name("daily_explore", meta),
-            figure=daily_profile(df, var, global_local),
+            figure=load_figure(df, daily_profile, var, global_local),
         ),
     )
 
@@ -592,11 +601,10 @@ def update_tab_daily(var, global_local, df, meta):
 @cache.memoize(timeout=TIMEOUT)
 def update_tab_heatmap(var, global_local, df, meta):
     """Update the contents of tab size. Passing in the info from the dropdown and the general info."""
-    df = pd.read_json(df, orient="split")
     return (
         dcc.Graph(
             config=generate_chart_name("heatmap_explore", meta),
-            figure=heatmap(df, var, global_local),
+            figure=load_figure(df, heatmap, var, global_local),
         ),
     )
 
@@ -644,7 +652,7 @@ def update_heatmap(
     invert_month,
     invert_hour,
 ):
-    df = pd.read_json(df, orient="split")
+    df = load_dataset(df)
     start_month, end_month = month
     if invert_month == ["invert"] and (start_month != 1 or end_month != 12):
         month = month[::-1]
@@ -736,7 +744,7 @@ def update_more_charts(
     # todo: dont allow to input if apply filter not checked
     # if (min_val3 is None or max_val3 is None) and data_filter3:
     #     raise PreventUpdate
-    df = pd.read_json(df, orient="split")
+    df = load_dataset(df)
     start_month, end_month = month
     if invert_month == ["invert"] and (start_month != 1 or end_month != 12):
         month = month[::-1]
@@ -781,5 +789,10 @@ def update_more_charts(
 @cache.memoize(timeout=TIMEOUT)
 def update_table(dd_value, df):
     """Update the contents of tab three. Passing in general info (df, meta)."""
-    df = pd.read_json(df, orient="split")
+    df = load_dataset(df)
     return summary_table_tmp_rh_tab(df, dd_value)
+
+
+default_figure(yearly_profile, "DBT", "local", ashrae=get_ashrae)
+default_figure(daily_profile, "DBT", "local")
+default_figure(heatmap, "DBT", "local")
@@ -12,7 +12,7 @@ from my_project.global_scheme import (
     container_col_center_one_of_three,
 )
 from dash.dependencies import Input, Output, State
-import pandas as pd
+from my_project.dataset_registry import load_dataset
 import numpy as np
 from my_project.utils import title_with_tooltip, generate_chart_name
 
@@ -273,7 +273,7 @@ def nv_heatmap(
     if len(condensation_enabled) == 1:
         dpt_data_filter = True
 
-    df = pd.read_json(df, orient="split")
+    df = load_dataset(df)
 
     start_month, end_month = month
     if invert_month == ["invert"] and (start_month != 1 or end_month != 12):
@@ -448,7 +448,7 @@ def nv_bar_chart(
     else:
         dpt_data_filter = False
 
-    df = pd.read_json(df, orient="split")
+    df = load_dataset(df)
 
     start_month, end_month = month
     if invert_month == ["invert"] and (start_month != 1 or end_month != 12):
@@ -3,7 +3,7 @@ from dash import html
 from my_project.global_scheme import outdoor_dropdown_names
 from dash.dependencies import Input, Output, State
 from my_project.template_graphs import heatmap
-import pandas as pd
+from my_project.figure_cache import default_figure, load_figure
 from my_project.utils import title_with_tooltip, generate_chart_name
 
 from app import app, cache, TIMEOUT
@@ -64,10 +64,9 @@ def layout_outdoor_comfort():
 )
 @cache.memoize(timeout=TIMEOUT)
 def update_tab_utci_value(var, global_local, df, meta):
-    df = pd.read_json(df, orient="split")
     return dcc.Graph(
         config=generate_chart_name("utci_heatmap", meta),
-        figure=heatmap(df, var, global_local),
+        figure=load_figure(df, heatmap, var, global_local),
     )
 
 
@@ -97,7 +96,14 @@ def change_image_based_on_selection(value):
 )
 @cache.memoize(timeout=TIMEOUT)
 def update_tab_utci_category(var, df, meta):
-    df = pd.read_json(df, orient="split")
+    return dcc.Graph(
+        config=generate_chart_name("utci_heatmap_category", meta),
+        figure=load_figure(df, utci_category_heatmap, var),
+    )
+
+
+def utci_category_heatmap(df, var):
+    """Heatmap of the thermal stress categories of the UTCI var."""
     utci_stress_cat = heatmap(df, var + "_categories")
     utci_stress_cat["data"][0]["colorbar"] = dict(
         title="Thermal stress",
@@ -118,7 +124,8 @@ def update_tab_utci_category(var, df, meta):
         ],
         ticks="outside",
     )
-    return dcc.Graph(
-        config=generate_chart_name("utci_heatmap_category", meta),
-        figure=utci_stress_cat,
-    )
+    return utci_stress_cat
+
+
+default_figure(heatmap, "utci_Sun_Wind", "local")
+default_figure(utci_category_heatmap, "utci_Sun_Wind")
@@ -1,6 +1,6 @@
+import functools
 import numpy as np
 import plotly.graph_objects as go
-from pythermalcomfort import psychrometrics as psy
 from math import ceil, floor
 import dash_bootstrap_components as dbc
 from dash import dcc
@@ -9,6 +9,7 @@ from my_project.global_scheme import (
     container_row_center_full,
     container_col_center_one_of_three,
 )
+from my_project.psychro import psy_ta_rh
 from my_project.utils import generate_chart_name
 
 from my_project.global_scheme import (
@@ -18,7 +19,8 @@ from my_project.global_scheme import (
     sun_cloud_tab_explore_dropdown_names,
 )
 from dash.dependencies import Input, Output, State
-import pandas as pd
+from my_project.dataset_registry import load_dataset
+from my_project.figure_cache import default_figure, load_figure
 
 from app import app
 
@@ -212,6 +214,29 @@ def layout_psy_chart():
 
 
 # psychrometric chart
+@functools.lru_cache(maxsize=None)
+def _rh_curves():
+    """Return the constant relative humidity curves drawn behind the data."""
+    dbt_list = list(range(-60, 60, 1))
+    rh_list = list(range(10, 110, 10))
+
+    # humidity ratio of each RH curve, one row per curve
+    rh_hr = psy_ta_rh(np.array(dbt_list)[None, :], np.array(rh_list)[:, None])["hr"]
+
+    return tuple(
+        go.Scatter(
+            x=dbt_list,
+            y=rh_hr[i],
+            showlegend=False,
+            mode="lines",
+            name="",
+            hovertemplate="RH " + str(rh) + "%",
+            line=dict(width=1, color="lightgrey"),
+        )
+        for i, rh in enumerate(rh_list)
+    )
+
+
 @app.callback(
     Output("psych-chart", "children"),
     [
@@ -248,7 +273,8 @@ def update_psych_chart(
     invert_month,
     invert_hour,
 ):
-    df = pd.read_json(df, orient="split")
+    key = df
+    df = load_dataset(key)
     start_month, end_month = month
     if invert_month == ["invert"] and (start_month != 1 or end_month != 12):
         month = month[::-1]
@@ -303,6 +329,17 @@ def update_psych_chart(
             ),
         )
 
+    if time_filter or data_filter:
+        fig = psychrometric_chart(df, colorby_var, global_local)
+    else:
+        # the whole dataset, the same for all the users of the station
+        fig = load_figure(key, psychrometric_chart, colorby_var, global_local)
+
+    return dcc.Graph(config=generate_chart_name("psy", meta), figure=fig)
+
+
+def psychrometric_chart(df, colorby_var, global_local):
+    """Psychrometric chart of df, colored by colorby_var."""
     var = colorby_var
     if var == "None":
         var_color = "darkorange"
@@ -336,32 +373,10 @@ def update_psych_chart(
     if colorby_var != "None" and colorby_var != "Frequency":
         title = title + " colored by " + var_name + " (" + var_unit + ")"
 
-    dbt_list = list(range(-60, 60, 1))
-    rh_list = list(range(10, 110, 10))
-
-    rh_df = pd.DataFrame()
-    for i, rh in enumerate(rh_list):
-        hr_list = np.vectorize(psy.psy_ta_rh)(dbt_list, rh)
-        hr_df = pd.DataFrame.from_records(hr_list)
-        name = "rh" + str(rh)
-        rh_df[name] = hr_df["hr"]
-
     fig = go.Figure()
 
     # Add traces
-    for i, rh in enumerate(rh_list):
-        name = "rh" + str(rh)
-        fig.add_trace(
-            go.Scatter(
-                x=dbt_list,
-                y=rh_df[name],
-                showlegend=False,
-                mode="lines",
-                name="",
-                hovertemplate="RH " + str(rh) + "%",
-                line=dict(width=1, color="lightgrey"),
-            )
-        )
+    fig.add_traces(_rh_curves())
     if var == "None":
         fig.add_trace(
             go.Scatter(
@@ -463,4 +478,7 @@ def update_psych_chart(
         mirror=True,
     )
 
-    return dcc.Graph(config=generate_chart_name("psy", meta), figure=fig)
+    return fig
+
+
+default_figure(psychrometric_chart, "Frequency", "local")
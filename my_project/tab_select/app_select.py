@@ -1,16 +1,28 @@
 import base64
-import io
-import re
+import json
 import dash
 import dash_bootstrap_components as dbc
 from dash import dcc
 from dash import html
-from dash.dependencies import Input, Output, State
+from dash.dependencies import ALL, Input, Output, State
 from dash.exceptions import PreventUpdate
+from flask import jsonify, request
 
 from app import app
-from my_project.extract_df import create_df, get_data
-from my_project.utils import plot_location_epw_files, generate_chart_name
+from my_project.dataset_registry import get_cached_location
+from my_project.epw_jobs import (
+    epw_job_stalled,
+    epw_job_status,
+    job_stages,
+    submit_epw_job,
+)
+from my_project.figure_cache import new_session, prerender_figures
+from my_project.station_catalog import (
+    load_station_catalog,
+    nearest_stations,
+    search_stations,
+)
+from my_project.utils import generate_chart_name, map_view, plot_location_epw_files
 
 messages_alert = {
     "start": "To start, upload an EPW file or click on a point on the map!",
@@ -18,7 +30,9 @@ messages_alert = {
     "success": "The EPW was successfully loaded!",
     "invalid_format": "The format of the EPW file you have uploaded is invalid.",
     "wrong_extension": "The file you have uploaded is not an EPW file",
+    "processing_failed": "The EPW file could not be processed.",
 }
+MAX_NEAREST_STATIONS = 50
 
 
 def layout_select():
@@ -26,12 +40,7 @@ def layout_select():
     return html.Div(
         className="container-col tab-container",
         children=[
-            dcc.Loading(
-                id="loading-1",
-                type="circle",
-                fullscreen=True,
-                children=alert(),
-            ),
+            alert(),
             dcc.Upload(
                 id="upload-data",
                 children=dbc.Button(
@@ -49,6 +58,8 @@ def layout_select():
                 # Allow multiple files to be uploaded
                 multiple=True,
             ),
+            station_name_search(),
+            nearest_stations_search(),
             dcc.Graph(
                 id="tab-one-map",
                 figure=plot_location_epw_files(),
@@ -82,6 +93,101 @@ def layout_select():
     )
 
 
+def station_name_search():
+    """Search box listing the stations matching the text typed."""
+    return html.Div(
+        className="mt-2",
+        children=[
+            dbc.Input(
+                id="station-search",
+                type="search",
+                placeholder="Search a station by name or WMO number",
+                autoComplete="off",
+            ),
+            html.Div(id="station-search-results", className="mt-2"),
+        ],
+    )
+
+
+def nearest_stations_search():
+    """Coordinates inputs to list the stations closest to a known site."""
+    return html.Div(
+        className="mt-2",
+        children=[
+            dbc.Row(
+                [
+                    dbc.Col(html.Label("Latitude"), width=3, md="auto"),
+                    dbc.Col(
+                        dbc.Input(
+                            id="nearest-lat",
+                            type="number",
+                            min=-90,
+                            max=90,
+                            style={"width": "7rem"},
+                        ),
+                        width=9,
+                        md="auto",
+                    ),
+                    dbc.Col(html.Label("Longitude"), width=3, md="auto"),
+                    dbc.Col(
+                        dbc.Input(
+                            id="nearest-lon",
+                            type="number",
+                            min=-180,
+                            max=180,
+                            style={"width": "7rem"},
+                        ),
+                        width=9,
+                        md="auto",
+                    ),
+                    dbc.Col(
+                        dbc.Button(
+                            "Find nearest stations",
+                            id="nearest-button",
+                            color="primary",
+                        ),
+                        width=12,
+                        md="auto",
+                    ),
+                ],
+                align="center",
+            ),
+            html.Div(id="nearest-stations", className="mt-2"),
+        ],
+    )
+
+
+def station_options(stations, list_id):
+    """List of the stations, clicking one asks to analyse its EPW file.
+
+    The index of stations is the position of the station in the catalog, the
+    distance in km is shown if stations has a "distance" column. list_id
+    tells apart lists that may show the same station.
+    """
+    items = []
+    for position, station in stations.iterrows():
+        text = f"{station['name']} - {station['source']}"
+        if station["period"]:
+            text += f" {station['period']}"
+        if "distance" in stations:
+            text += f", {station['distance']:.0f} km"
+        items.append(
+            dbc.ListGroupItem(
+                text,
+                id={"type": "station-option", "list": list_id, "index": int(position)},
+                action=True,
+                n_clicks=0,
+            )
+        )
+    return dbc.ListGroup(items)
+
+
+def selected_station(prop_id):
+    """Return the catalog row of the station option in the triggering prop_id."""
+    index = json.loads(prop_id.rsplit(".", 1)[0])["index"]
+    return load_station_catalog().iloc[index]
+
+
 def alert():
     """Alert layout for the submit button."""
     return html.Div(
@@ -98,6 +204,21 @@ def alert():
     )
 
 
+def progress_message(stage):
+    """Alert content reporting the stage the processing of the EPW is at."""
+    stages = list(job_stages)
+    return [
+        f"{job_stages[stage]}...",
+        dbc.Progress(
+            value=100 * (stages.index(stage) + 1) / len(stages),
+            striped=True,
+            animated=True,
+            className="mt-2",
+            style={"height": "4px"},
+        ),
+    ]
+
+
 @app.callback(
     [
         Output("df-store", "data"),
@@ -105,83 +226,113 @@ def alert():
         Output("alert", "is_open"),
         Output("alert", "children"),
         Output("alert", "color"),
+        Output("epw-job-store", "data"),
+        Output("epw-job-interval", "disabled"),
+        Output("session-store", "data"),
     ],
     [
         Input("modal-yes-button", "n_clicks"),
         Input("upload-data-button", "n_clicks"),
         Input("upload-data", "contents"),
+        Input("epw-job-interval", "n_intervals"),
     ],
     [
         State("upload-data", "filename"),
         State("url-store", "data"),
+        State("epw-job-store", "data"),
+        State("session-store", "data"),
     ],
     prevent_initial_call=True,
 )
 # @code_timer
 def submitted_data(
-    use_epw_click, upload_click, list_of_contents, list_of_names, url_store
+    use_epw_click,
+    upload_click,
+    list_of_contents,
+    n_intervals,
+    list_of_names,
+    url_store,
+    job_id,
+    session,
 ):
-    """Process the uploaded file or download the EPW from the URL"""
+    """Process the uploaded file or download the EPW from the URL.
+
+    The EPW is processed by a job, polled until it is done so that the server
+    threads are not blocked, the alert shows the stage it is at.
+    """
     ctx = dash.callback_context
+    prop_id = ctx.triggered[0]["prop_id"]
 
-    if ctx.triggered[0]["prop_id"] == "modal-yes-button.n_clicks":
-        lines = get_data(url_store)
-        if lines is None:
-            return (
-                None,
-                None,
-                True,
-                messages_alert["not_available"],
-                "warning",
-            )
-        df, location_info = create_df(lines, url_store)
-        # fixme: DeprecationWarning: an integer is required (got type float).
-        df = df.to_json(date_format="iso", orient="split")
+    def loaded_location(key, location_info):
+        # stops the pre-rendering of the location loaded before in this session
+        session_id = session or new_session()
+        prerender_figures(key, session_id)
         return (
-            df,
+            key,
             location_info,
             True,
             messages_alert["success"],
             "success",
+            None,
+            True,
+            session_id,
         )
 
-    elif (
-        ctx.triggered[0]["prop_id"] == "upload-data.contents"
-        and list_of_contents is not None
-    ):
+    def failed(message):
+        return None, None, True, message, "warning", None, True, dash.no_update
+
+    def submitted(job_id):
+        return (
+            dash.no_update,
+            dash.no_update,
+            True,
+            progress_message("queued"),
+            "primary",
+            job_id,
+            False,
+            dash.no_update,
+        )
+
+    if prop_id == "epw-job-interval.n_intervals":
+        status = epw_job_status(job_id)
+        if status is None or epw_job_stalled(status):
+            return failed(messages_alert["not_available"])
+        if status["stage"] != "done":
+            return (
+                dash.no_update,
+                dash.no_update,
+                True,
+                progress_message(status["stage"]),
+                "primary",
+                dash.no_update,
+                dash.no_update,
+                dash.no_update,
+            )
+        if "error" in status:
+            return failed(
+                f"{messages_alert[status['error']]} {status.get('detail', '')}"
+            )
+        return loaded_location(status["key"], status["location_info"])
+
+    if prop_id == "modal-yes-button.n_clicks":
+        cached = get_cached_location(url_store)
+        if cached is not None:
+            return loaded_location(*cached)
+        return submitted(submit_epw_job(url=url_store))
+
+    elif prop_id == "upload-data.contents" and list_of_contents is not None:
         content_type, content_string = list_of_contents[0].split(",")
 
         decoded = base64.b64decode(content_string)
+        if "epw" not in list_of_names[0]:
+            return failed(messages_alert["invalid_format"])
         try:
-            if "epw" in list_of_names[0]:
-                # Assume that the user uploaded a CSV file
-                lines = io.StringIO(decoded.decode("utf-8")).read().split("\n")
-                df, location_info = create_df(lines, list_of_names[0])
-                df = df.to_json(date_format="iso", orient="split")
-                return (
-                    df,
-                    location_info,
-                    True,
-                    messages_alert["success"],
-                    "success",
-                )
-            else:
-                return (
-                    None,
-                    None,
-                    True,
-                    messages_alert["invalid_format"],
-                    "warning",
-                )
-        except Exception as e:
+            text = decoded.decode("utf-8")
+        except UnicodeDecodeError as e:
             print(e)
-            return (
-                None,
-                None,
-                True,
-                messages_alert["wrong_extension"],
-                "warning",
-            )
+            return failed(f"{messages_alert['invalid_format']} {e}")
+        return submitted(submit_epw_job(text=text, file_name=list_of_names[0]))
+
     raise PreventUpdate
 
 
@@ -230,39 +381,99 @@ def enable_tabs_when_data_is_loaded(data, meta):
 
 
 @app.callback(
-    [
-        Output("modal", "is_open"),
-        Output("url-store", "data"),
-    ],
-    [
-        Input("modal-yes-button", "n_clicks"),
-        Input("tab-one-map", "clickData"),
-        Input("modal-close-button", "n_clicks"),
-    ],
-    [State("modal", "is_open")],
+    Output("tab-one-map", "figure"),
+    Input("tab-one-map", "relayoutData"),
     prevent_initial_call=True,
 )
-def display_modal_when_data_clicked(clicks_use_epw, click_map, close_clicks, is_open):
-    """display the modal to the user and check if he wants to use that file"""
-    if click_map:
-        url = re.search(
-            r'href=[\'"]?([^\'" >]+)', click_map["points"][0]["customdata"][0]
-        ).group(1)
-        return not is_open, url
-    return is_open, ""
+def update_stations_in_view(relayout_data):
+    """Show only the stations in the map view, clustered when zoomed out"""
+    view = map_view(relayout_data)
+    if view is None:
+        raise PreventUpdate
+    return plot_location_epw_files(*view)
+
+
+@app.callback(
+    Output("nearest-stations", "children"),
+    Input("nearest-button", "n_clicks"),
+    [State("nearest-lat", "value"), State("nearest-lon", "value")],
+    prevent_initial_call=True,
+)
+def list_nearest_stations(n_clicks, lat, lon):
+    """List the stations closest to the coordinates entered by the user"""
+    if lat is None or lon is None:
+        raise PreventUpdate
+    return station_options(nearest_stations(lat, lon), "nearest")
+
+
+@app.callback(
+    Output("station-search-results", "children"),
+    Input("station-search", "value"),
+    prevent_initial_call=True,
+)
+def list_searched_stations(query):
+    """List the stations matching the text typed in the search box"""
+    if not query:
+        return None
+    return station_options(search_stations(query), "search")
+
+
+@app.server.route("/api/nearest-stations")
+def api_nearest_stations():
+    """Return as JSON the n (default 5) stations closest to the lat and lon args"""
+    try:
+        lat = float(request.args["lat"])
+        lon = float(request.args["lon"])
+        n = int(request.args.get("n", 5))
+    except (KeyError, ValueError):
+        return jsonify(error="lat and lon must be numbers, n an integer"), 400
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180 and 0 < n <= MAX_NEAREST_STATIONS):
+        return (
+            jsonify(
+                error="lat must be in [-90, 90], lon in [-180, 180] and n in "
+                f"[1, {MAX_NEAREST_STATIONS}]"
+            ),
+            400,
+        )
+    stations = nearest_stations(lat, lon, n)
+    return jsonify(
+        stations[["name", "source", "url", "lat", "lon", "period", "distance"]]
+        .astype({"source": str, "period": str})
+        .to_dict("records")
+    )
 
 
 @app.callback(
     [
+        Output("modal", "is_open"),
+        Output("url-store", "data"),
         Output("modal-header", "children"),
     ],
     [
+        Input("modal-yes-button", "n_clicks"),
         Input("tab-one-map", "clickData"),
+        Input("modal-close-button", "n_clicks"),
+        Input({"type": "station-option", "list": ALL, "index": ALL}, "n_clicks"),
     ],
     prevent_initial_call=True,
 )
-def display_modal_when_data_clicked(click_map):
-    """change the text of the modal header"""
-    if click_map:
-        return [f"Analyse data from {click_map['points'][0]['hovertext']}?"]
-    return ["Analyse data from this location?"]
+def display_modal_when_data_clicked(
+    clicks_use_epw, click_map, close_clicks, station_clicks
+):
+    """display the modal to the user and check if he wants to use that file"""
+    triggered = dash.callback_context.triggered[0]
+    if triggered["prop_id"] == "tab-one-map.clickData" and click_map:
+        point = click_map["points"][0]
+        if "customdata" not in point:
+            # a cluster of stations
+            raise PreventUpdate
+        return True, point["customdata"][0], f"Analyse data from {point['hovertext']}?"
+    elif triggered["prop_id"].startswith("{") and triggered["value"]:
+        station = selected_station(triggered["prop_id"])
+        return True, station["url"], f"Analyse data from {station['name']}?"
+    elif triggered["prop_id"] in (
+        "modal-yes-button.n_clicks",
+        "modal-close-button.n_clicks",
+    ):
+        return False, dash.no_update, dash.no_update
+    raise PreventUpdate
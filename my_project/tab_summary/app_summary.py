@@ -3,16 +3,21 @@ from dash import dcc
 from dash import html
 from dash.dependencies import Input, Output, State
 import dash
-import pandas as pd
+from my_project.dataset_registry import load_dataset
+from my_project.figure_cache import default_figure, load_figure
 from dash.exceptions import PreventUpdate
 from app import app, cache, TIMEOUT
 from my_project.tab_summary.charts_summary import world_map
 from my_project.template_graphs import violin
-from my_project.utils import generate_chart_name, title_with_tooltip
+from my_project.utils import (
+    generate_chart_name,
+    monthly_degree_days,
+    title_with_tooltip,
+)
 import plotly.graph_objects as go
 from my_project.global_scheme import template, tight_margins
-import requests
 from my_project.extract_df import get_data
+from my_project.koppen_geiger import climate_zone, zone_descriptions
 
 
 # @code_timer
@@ -169,7 +174,7 @@ def layout_summary():
     Input("df-store", "modified_timestamp"),
     State("meta-store", "data"),
 )
-@cache.memoize(timeout=TIMEOUT)
+@cache.memoize(timeout=TIMEOUT, args_to_ignore=["ts"])
 def update_map(ts, meta):
     """Update the contents of tab two. Passing in the general info (df, meta)."""
     map_world = dcc.Graph(
@@ -186,7 +191,7 @@ def update_map(ts, meta):
     Input("df-store", "modified_timestamp"),
     [State("df-store", "data"), State("meta-store", "data")],
 )
-@cache.memoize(timeout=TIMEOUT)
+@cache.memoize(timeout=TIMEOUT, args_to_ignore=["ts"])
 # @code_timer
 def update_location_info(ts, df, meta):
     """Update the contents of tab two. Passing in the general info (df, meta)."""
@@ -199,24 +204,13 @@ def update_location_info(ts, df, meta):
         start, stop = meta["period"].split("-")
         period = f"This file is based on data collected between {start} and {stop}"
 
-    r = requests.get(
-        f"http://climateapi.scottpinkelman.com/api/v1/location/{meta['lat']}/{meta['lon']}"
-    )
-
     climate_text = ""
-    if r.status_code == 200:
-        try:
-            climate_zone = r.json()["return_values"][0]["koppen_geiger_zone"]
-            zone_description = r.json()["return_values"][0]["zone_description"]
-
-            climate_text = (
-                f"Köppen–Geiger climate zone: {climate_zone}. {zone_description}."
-            )
-        except KeyError:
-            pass
+    zone = climate_zone(meta["lat"], meta["lon"])
+    if zone is not None:
+        climate_text = f"Köppen–Geiger climate zone: {zone}. {zone_descriptions[zone]}."
 
     # global horizontal irradiance
-    df = pd.read_json(df, orient="split")
+    df = load_dataset(df)
     total_solar_rad = f"Annual cumulative horizontal solar radiation: {df['glob_hor_rad'].sum() /1000} kWh/m2"
     total_diffuse_rad = f"Percentage of diffuse horizontal solar radiation: {round(df['dif_hor_rad'].sum()/df['glob_hor_rad'].sum()*100, 1)} %"
     average_yearly_tmp = f"Average yearly temperature: {df['DBT'].mean().round(1)} °C"
@@ -262,7 +256,7 @@ def update_location_info(ts, df, meta):
         State("submit-set-points", "n_clicks"),
     ],
 )
-@cache.memoize(timeout=TIMEOUT)
+@cache.memoize(timeout=TIMEOUT, args_to_ignore=["ts_click", "n_clicks"])
 # @code_timer
 def degree_day_chart(ts_click, df, meta, hdd_value, cdd_value, n_clicks):
     """Update the contents of tab two. Passing in the general info (df, meta)."""
@@ -284,30 +278,10 @@ def degree_day_chart(ts_click, df, meta, hdd_value, cdd_value, n_clicks):
         color_hdd = "red"
         color_cdd = "dodgerblue"
 
-        df = pd.read_json(df, orient="split")
+        df = load_dataset(df)
 
-        hdd_array = []
-        cdd_array = []
         months = df["month_names"].unique()
-
-        for i in range(1, 13):
-            query_month = "month=="
-
-            # calculates HDD per month
-            query = query_month + str(i) + " and DBT<=" + str(hdd_setpoint)
-            a = df.query(query)["DBT"].sub(hdd_setpoint)
-            hdd = a.sum(axis=0, skipna=True)
-            hdd = hdd / 24
-            hdd = int(hdd)
-            hdd_array.append(hdd)
-
-            # calculates CDD per month
-            query = query_month + str(i) + " and DBT>=" + str(cdd_setpoint)
-            a = df.query(query)["DBT"].sub(cdd_setpoint)
-            cdd = a.sum(axis=0, skipna=True)
-            cdd = cdd / 24
-            cdd = int(cdd)
-            cdd_array.append(cdd)
+        hdd_array, cdd_array = monthly_degree_days(df, hdd_setpoint, cdd_setpoint)
 
         trace1 = go.Bar(
             x=months,
@@ -365,13 +339,11 @@ def degree_day_chart(ts_click, df, meta, hdd_value, cdd_value, n_clicks):
 @cache.memoize(timeout=TIMEOUT)
 # @code_timer
 def update_violin_tdb(global_local, df, meta):
-    df = pd.read_json(df, orient="split")
-
     return dcc.Graph(
         id="tdb-profile-graph",
         className="violin-container",
         config=generate_chart_name("tdb_summary", meta),
-        figure=violin(df, "DBT", global_local),
+        figure=load_figure(df, violin, "DBT", global_local),
     )
 
 
@@ -384,13 +356,11 @@ def update_violin_tdb(global_local, df, meta):
 # @code_timer
 def update_tab_wind(global_local, df, meta):
     """Update the contents of tab two. Passing in the general info (df, meta)."""
-    df = pd.read_json(df, orient="split")
-
     return dcc.Graph(
         id="wind-profile-graph",
         className="violin-container",
         config=generate_chart_name("wind_summary", meta),
-        figure=violin(df, "wind_speed", global_local),
+        figure=load_figure(df, violin, "wind_speed", global_local),
     )
 
 
@@ -403,13 +373,11 @@ def update_tab_wind(global_local, df, meta):
 # @code_timer
 def update_tab_rh(global_local, df, meta):
     """Update the contents of tab two. Passing in the general info (df, meta)."""
-    df = pd.read_json(df, orient="split")
-
     return dcc.Graph(
         id="rh-profile-graph",
         className="violin-container",
         config=generate_chart_name("rh_summary", meta),
-        figure=violin(df, "RH", global_local),
+        figure=load_figure(df, violin, "RH", global_local),
     )
 
 
@@ -422,13 +390,11 @@ def update_tab_rh(global_local, df, meta):
 # @code_timer
 def update_tab_gh_rad(global_local, df, meta):
     """Update the contents of tab two. Passing in the general info (df, meta)."""
-    df = pd.read_json(df, orient="split")
-
     return dcc.Graph(
         id="gh_rad-profile-graph",
         className="violin-container",
         config=generate_chart_name("solar_summary", meta),
-        figure=violin(df, "glob_hor_rad", global_local),
+        figure=load_figure(df, violin, "glob_hor_rad", global_local),
     )
 
 
@@ -443,7 +409,7 @@ def download_clima_dataframe(n_clicks, df, meta):
     if n_clicks is None:
         raise PreventUpdate
     elif df is not None:
-        df = pd.read_json(df, orient="split")
+        df = load_dataset(df)
         return dcc.send_data_frame(
             df.to_csv, f"df_{meta['city']}_{meta['country']}_Clima.csv"
         )
@@ -462,9 +428,18 @@ def download_clima_dataframe(n_clicks, meta):
     if n_clicks is None:
         raise PreventUpdate
     elif meta is not None:
+        # served from the download cache, the file has just been loaded
         lines = get_data(meta["url"])
+        if lines is None:
+            raise PreventUpdate
         return dict(
             content="\n".join(lines), filename=f"{meta['city']}_{meta['country']}.epw"
         )
     else:
         raise PreventUpdate
+
+
+default_figure(violin, "DBT", "local")
+default_figure(violin, "wind_speed", "local")
+default_figure(violin, "RH", "local")
+default_figure(violin, "glob_hor_rad", "local")
@@ -14,7 +14,8 @@ from my_project.tab_sun.charts_sun import (
     custom_cartesian_solar,
 )
 from my_project.template_graphs import heatmap, barchart, daily_profile
-import pandas as pd
+from my_project.dataset_registry import load_dataset
+from my_project.figure_cache import default_figure, load_figure
 from my_project.utils import title_with_tooltip, generate_chart_name
 
 from app import app, cache, TIMEOUT
@@ -86,7 +87,7 @@ def sun_path():
 
 
 def explore_daily_heatmap():
-    """ Contents of the bottom part of the tab"""
+    """Contents of the bottom part of the tab"""
     return html.Div(
         className="container-col full-width",
         children=[
@@ -177,10 +178,10 @@ def layout_sun():
     ],
     [State("df-store", "data"), State("meta-store", "data")],
 )
-@cache.memoize(timeout=TIMEOUT)
+@cache.memoize(timeout=TIMEOUT, args_to_ignore=["ts"])
 def monthly_and_cloud_chart(ts, df, meta):
     """Update the contents of tab four. Passing in the polar selection and the general info (df, meta)."""
-    df = pd.read_json(df, orient="split")
+    df = load_dataset(df)
 
     # Sun Radiation
     monthly = monthly_solar(df)
@@ -215,7 +216,7 @@ def monthly_and_cloud_chart(ts, df, meta):
 @cache.memoize(timeout=TIMEOUT)
 def sun_path_chart(view, var, global_local, df, meta):
     """Update the contents of tab four. Passing in the polar selection and the general info (df, meta)."""
-    df = pd.read_json(df, orient="split")
+    df = load_dataset(df)
 
     if view == "polar":
         return dcc.Graph(
@@ -240,10 +241,9 @@ def sun_path_chart(view, var, global_local, df, meta):
 @cache.memoize(timeout=TIMEOUT)
 def daily(var, global_local, df, meta):
     """Update the contents of tab four section two. Passing in the general info (df, meta)."""
-    df = pd.read_json(df, orient="split")
     return dcc.Graph(
         config=generate_chart_name("daily_sun", meta),
-        figure=daily_profile(df, var, global_local),
+        figure=load_figure(df, daily_profile, var, global_local),
     )
 
 
@@ -257,8 +257,11 @@ def daily(var, global_local, df, meta):
 )
 @cache.memoize(timeout=TIMEOUT)
 def update_heatmap(var, global_local, df, meta):
-    df = pd.read_json(df, orient="split")
     return dcc.Graph(
         config=generate_chart_name("heatmap_sun", meta),
-        figure=heatmap(df, var, global_local),
+        figure=load_figure(df, heatmap, var, global_local),
     )
+
+
+default_figure(daily_profile, "glob_hor_rad", "local")
+default_figure(heatmap, "glob_hor_rad", "local")
@@ -1,4 +1,4 @@
-from datetime import timedelta
+import functools
 from math import ceil, cos, floor, radians
 
 import numpy as np
@@ -11,8 +11,8 @@ from my_project.global_scheme import (
     tight_margins,
     month_lst,
 )
+from my_project.solar_position import daily_solar_position
 from plotly.subplots import make_subplots
-from pvlib import solarposition
 
 
 def monthly_solar(epw_df):
@@ -97,6 +97,122 @@ def monthly_solar(epw_df):
     return fig
 
 
+@functools.lru_cache(maxsize=None)
+def _altitude_circles():
+    """Return the altitude circles of the polar sun path, the same everywhere."""
+    theta = np.arange(361)
+    return tuple(
+        go.Scatterpolar(
+            r=np.full(361, 90 * cos(radians(i * 10))),
+            theta=theta,
+            mode="lines",
+            line_color="silver",
+            line_width=1,
+            hovertemplate="Altitude circle<br>" + str(i * 10) + degrees_unit,
+            name="",
+        )
+        for i in range(10)
+    )
+
+
+@functools.lru_cache(maxsize=64)
+def _polar_sun_paths(latitude, longitude, time_zone):
+    """Return the traces of the reference sun paths of the polar sun path."""
+    traces = []
+    # draw equinox and sostices
+    for date in pd.to_datetime(["2019-03-21", "2019-06-21", "2019-12-21"]):
+        solpos = daily_solar_position(date, latitude, longitude, time_zone)
+        solpos = solpos.loc[solpos["apparent_elevation"] > 0, :]
+
+        traces.append(
+            go.Scatterpolar(
+                r=90 * np.cos(np.radians(90 - solpos.apparent_zenith)),
+                theta=solpos.azimuth,
+                mode="lines",
+                line_color="orange",
+                line_width=3,
+                customdata=90 - solpos.apparent_zenith,
+                hovertemplate="<br>sun altitude: %{customdata:.2f}"
+                + degrees_unit
+                + "<br>sun azimuth: %{theta:.2f}"
+                + degrees_unit
+                + "<br>",
+                name="",
+            )
+        )
+
+    # draw sunpath on the 21st of each other month
+    for date in pd.to_datetime(["2019-01-21", "2019-02-21", "2019-4-21", "2019-5-21"]):
+        solpos = daily_solar_position(date, latitude, longitude, time_zone)
+        solpos = solpos.loc[solpos["apparent_elevation"] > 0, :]
+
+        traces.append(
+            go.Scatterpolar(
+                r=90 * np.cos(np.radians(90 - solpos.apparent_zenith)),
+                theta=solpos.azimuth,
+                mode="lines",
+                line_color="orange",
+                line_width=1,
+                customdata=90 - solpos.apparent_zenith,
+                hovertemplate="<br>sun altitude: %{customdata:.2f}"
+                + degrees_unit
+                + "<br>sun azimuth: %{theta:.2f}"
+                + degrees_unit
+                + "<br>",
+                name="",
+            )
+        )
+    return tuple(traces)
+
+
+@functools.lru_cache(maxsize=64)
+def _cartesian_sun_paths(latitude, longitude, time_zone):
+    """Return the traces of the reference sun paths of the cartesian sun path."""
+    traces = []
+    # draw equinox and sostices
+    for date in pd.to_datetime(["2019-03-21", "2019-06-21", "2019-12-21"]):
+        solpos = daily_solar_position(date, latitude, longitude, time_zone)
+        solpos = solpos.loc[solpos["apparent_elevation"] > 0, :]
+
+        traces.append(
+            go.Scatter(
+                y=(90 - solpos.apparent_zenith),
+                x=solpos.azimuth,
+                mode="markers",
+                marker_color="orange",
+                marker_size=4,
+                hovertemplate="<br>sun altitude: %{y:.2f}"
+                + degrees_unit
+                + "<br>sun azimuth: %{x:.2f}"
+                + degrees_unit
+                + "<br>",
+                name="",
+            )
+        )
+
+    # draw sunpath on the 21st of each other month
+    for date in pd.to_datetime(["2019-01-21", "2019-02-21", "2019-4-21", "2019-5-21"]):
+        solpos = daily_solar_position(date, latitude, longitude, time_zone)
+        solpos = solpos.loc[solpos["apparent_elevation"] > 0, :]
+
+        traces.append(
+            go.Scatter(
+                y=(90 - solpos.apparent_zenith),
+                x=solpos.azimuth,
+                mode="markers",
+                marker_color="orange",
+                marker_size=3,
+                hovertemplate="<br>sun altitude: %{y:.2f}"
+                + degrees_unit
+                + "<br>sun azimuth: %{x:.2f}"
+                + degrees_unit
+                + "<br>",
+                name="",
+            )
+        )
+    return tuple(traces)
+
+
 def polar_graph(df, meta, global_local, var):
     """Return the figure for the custom sun path."""
     latitude = float(meta["lat"])
@@ -118,12 +234,6 @@ def polar_graph(df, meta, global_local, var):
             data_min = 5 * floor(solpos[var].min() / 5)
             range_z = [data_min, data_max]
 
-    tz = "UTC"
-    times = pd.date_range(
-        "2019-01-01 00:00:00", "2020-01-01", closed="left", freq="H", tz=tz
-    )
-    delta = timedelta(days=0, hours=time_zone - 1, minutes=0)
-    times = times - delta
     solpos = df.loc[df["apparent_elevation"] > 0, :]
 
     if var == "None":
@@ -135,22 +245,7 @@ def polar_graph(df, meta, global_local, var):
 
     fig = go.Figure()
     # draw altitude circles
-    for i in range(10):
-        pt = []
-        for j in range(361):
-            pt.append(j)
-
-        fig.add_trace(
-            go.Scatterpolar(
-                r=[90 * cos(radians(i * 10))] * 361,
-                theta=pt,
-                mode="lines",
-                line_color="silver",
-                line_width=1,
-                hovertemplate="Altitude circle<br>" + str(i * 10) + degrees_unit,
-                name="",
-            )
-        )
+    fig.add_traces(_altitude_circles())
     # Draw annalemma
     if var == "None":
         fig.add_trace(
@@ -225,53 +320,9 @@ def polar_graph(df, meta, global_local, var):
             )
         )
 
-    # draw equinox and sostices
-    for date in pd.to_datetime(["2019-03-21", "2019-06-21", "2019-12-21"]):
-        times = pd.date_range(date, date + pd.Timedelta("24h"), freq="5min", tz=tz)
-        times = times - delta
-        solpos = solarposition.get_solarposition(times, latitude, longitude)
-        solpos = solpos.loc[solpos["apparent_elevation"] > 0, :]
+    # draw equinox, solstices and the 21st of each other month
+    fig.add_traces(_polar_sun_paths(latitude, longitude, time_zone))
 
-        fig.add_trace(
-            go.Scatterpolar(
-                r=90 * np.cos(np.radians(90 - solpos.apparent_zenith)),
-                theta=solpos.azimuth,
-                mode="lines",
-                line_color="orange",
-                line_width=3,
-                customdata=90 - solpos.apparent_zenith,
-                hovertemplate="<br>sun altitude: %{customdata:.2f}"
-                + degrees_unit
-                + "<br>sun azimuth: %{theta:.2f}"
-                + degrees_unit
-                + "<br>",
-                name="",
-            )
-        )
-
-    # draw sunpath on the 21st of each other month
-    for date in pd.to_datetime(["2019-01-21", "2019-02-21", "2019-4-21", "2019-5-21"]):
-        times = pd.date_range(date, date + pd.Timedelta("24h"), freq="5min", tz=tz)
-        times = times - delta
-        solpos = solarposition.get_solarposition(times, latitude, longitude)
-        solpos = solpos.loc[solpos["apparent_elevation"] > 0, :]
-
-        fig.add_trace(
-            go.Scatterpolar(
-                r=90 * np.cos(np.radians(90 - solpos.apparent_zenith)),
-                theta=solpos.azimuth,
-                mode="lines",
-                line_color="orange",
-                line_width=1,
-                customdata=90 - solpos.apparent_zenith,
-                hovertemplate="<br>sun altitude: %{customdata:.2f}"
-                + degrees_unit
-                + "<br>sun azimuth: %{theta:.2f}"
-                + degrees_unit
-                + "<br>",
-                name="",
-            )
-        )
     fig.update_layout(
         showlegend=False,
         polar=dict(
@@ -305,7 +356,6 @@ def custom_cartesian_solar(df, meta, global_local, var):
     latitude = float(meta["lat"])
     longitude = float(meta["lon"])
     time_zone = float(meta["time_zone"])
-    tz = "UTC"
     if var != "None":
         var_unit = mapping_dictionary[var]["unit"]
         var_range = mapping_dictionary[var]["range"]
@@ -403,53 +453,8 @@ def custom_cartesian_solar(df, meta, global_local, var):
             )
         )
 
-    # draw equinox and sostices
-    for date in pd.to_datetime(["2019-03-21", "2019-06-21", "2019-12-21"]):
-        times = pd.date_range(date, date + pd.Timedelta("24h"), freq="5min", tz=tz)
-        delta = timedelta(days=0, hours=time_zone - 1, minutes=0)
-        times = times - delta
-        solpos = solarposition.get_solarposition(times, latitude, longitude)
-        solpos = solpos.loc[solpos["apparent_elevation"] > 0, :]
-
-        fig.add_trace(
-            go.Scatter(
-                y=(90 - solpos.apparent_zenith),
-                x=solpos.azimuth,
-                mode="markers",
-                marker_color="orange",
-                marker_size=4,
-                hovertemplate="<br>sun altitude: %{y:.2f}"
-                + degrees_unit
-                + "<br>sun azimuth: %{x:.2f}"
-                + degrees_unit
-                + "<br>",
-                name="",
-            )
-        )
-
-    # draw sunpath on the 21st of each other month
-    for date in pd.to_datetime(["2019-01-21", "2019-02-21", "2019-4-21", "2019-5-21"]):
-        times = pd.date_range(date, date + pd.Timedelta("24h"), freq="5min", tz=tz)
-        delta = timedelta(days=0, hours=time_zone - 1, minutes=0)
-        times = times - delta
-        solpos = solarposition.get_solarposition(times, latitude, longitude)
-        solpos = solpos.loc[solpos["apparent_elevation"] > 0, :]
-
-        fig.add_trace(
-            go.Scatter(
-                y=(90 - solpos.apparent_zenith),
-                x=solpos.azimuth,
-                mode="markers",
-                marker_color="orange",
-                marker_size=3,
-                hovertemplate="<br>sun altitude: %{y:.2f}"
-                + degrees_unit
-                + "<br>sun azimuth: %{x:.2f}"
-                + degrees_unit
-                + "<br>",
-                name="",
-            )
-        )
+    # draw equinox, solstices and the 21st of each other month
+    fig.add_traces(_cartesian_sun_paths(latitude, longitude, time_zone))
 
     fig.update_layout(
         showlegend=False,
@@ -5,8 +5,14 @@ from my_project.utils import (
     title_with_tooltip,
     summary_table_tmp_rh_tab,
 )
-from my_project.template_graphs import heatmap, yearly_profile, daily_profile
-import pandas as pd
+from my_project.template_graphs import (
+    daily_profile,
+    get_ashrae,
+    heatmap,
+    yearly_profile,
+)
+from my_project.dataset_registry import load_dataset
+from my_project.figure_cache import default_figure, load_figure
 from my_project.global_scheme import dropdown_names
 
 from app import app, cache, TIMEOUT
@@ -98,26 +104,26 @@ def layout_t_rh():
 @cache.memoize(timeout=TIMEOUT)
 # @code_timer
 def update_yearly_chart(global_local, dd_value, df, meta):
-    df = pd.read_json(df, orient="split")
-
     if dd_value == dropdown_names[var_to_plot[0]]:
-        dbt_yearly = yearly_profile(df, "DBT", global_local)
-        dbt_yearly.update_layout(xaxis=dict(rangeslider=dict(visible=True)))
-
         return dcc.Graph(
             config=generate_chart_name("tdb_yearly_t_rh", meta),
-            figure=dbt_yearly,
+            figure=load_figure(
+                df, yearly_chart, "DBT", global_local, ashrae=get_ashrae
+            ),
         )
     else:
-        rh_yearly = yearly_profile(df, "RH", global_local)
-        rh_yearly.update_layout(xaxis=dict(rangeslider=dict(visible=True)))
-
         return dcc.Graph(
             config=generate_chart_name("rh_yearly_t_rh", meta),
-            figure=rh_yearly,
+            figure=load_figure(df, yearly_chart, "RH", global_local),
         )
 
 
+def yearly_chart(df, var, global_local, ashrae=None):
+    """Yearly profile of var with a range slider."""
+    fig = yearly_profile(df, var, global_local, ashrae)
+    return fig.update_layout(xaxis=dict(rangeslider=dict(visible=True)))
+
+
 @app.callback(
     Output("daily", "children"),
     [Input("global-local-radio-input", "value"), Input("dropdown", "value")],
@@ -126,17 +132,15 @@ def update_yearly_chart(global_local, dd_value, df, meta):
 @cache.memoize(timeout=TIMEOUT)
 # @code_timer
 def update_daily(global_local, dd_value, df, meta):
-    df = pd.read_json(df, orient="split")
-
     if dd_value == dropdown_names[var_to_plot[0]]:
         return dcc.Graph(
             config=generate_chart_name("tdb_daily_t_rh", meta),
-            figure=daily_profile(df, "DBT", global_local),
+            figure=load_figure(df, daily_profile, "DBT", global_local),
         )
     else:
         return dcc.Graph(
             config=generate_chart_name("rh_daily_t_rh", meta),
-            figure=daily_profile(df, "RH", global_local),
+            figure=load_figure(df, daily_profile, "RH", global_local),
         )
 
 
@@ -149,16 +153,15 @@ def update_daily(global_local, dd_value, df, meta):
 # @code_timer
 def update_heatmap(global_local, dd_value, df, meta):
     """Update the contents of tab three. Passing in general info (df, meta)."""
-    df = pd.read_json(df, orient="split")
     if dd_value == dropdown_names[var_to_plot[0]]:
         return dcc.Graph(
             config=generate_chart_name("tdb_heatmap_t_rh", meta),
-            figure=heatmap(df, "DBT", global_local),
+            figure=load_figure(df, heatmap, "DBT", global_local),
         )
     else:
         return dcc.Graph(
             config=generate_chart_name("rh_heatmap_t_rh", meta),
-            figure=heatmap(df, "RH", global_local),
+            figure=load_figure(df, heatmap, "RH", global_local),
         )
 
 
@@ -170,5 +173,10 @@ def update_heatmap(global_local, dd_value, df, meta):
 @cache.memoize(timeout=TIMEOUT)
 def update_table(dd_value, df):
     """Update the contents of tab three. Passing in general info (df, meta)."""
-    df = pd.read_json(df, orient="split")
+    df = load_dataset(df)
     return summary_table_tmp_rh_tab(df, dd_value)
+
+
+default_figure(yearly_chart, "DBT", "local", ashrae=get_ashrae)
+default_figure(daily_profile, "DBT", "local")
+default_figure(heatmap, "DBT", "local")
@@ -1,8 +1,9 @@
 from dash import dcc, html
 from my_project.global_scheme import month_lst, container_row_center_full
 from dash.dependencies import Input, Output, State
-from my_project.template_graphs import heatmap, wind_rose
-import pandas as pd
+from my_project.template_graphs import heatmap, wind_rose, wind_rose_histogram
+from my_project.dataset_registry import load_dataset, load_derived
+from my_project.figure_cache import default_figure, load_figure
 from my_project.utils import title_with_tooltip, generate_chart_name
 
 from app import app, cache, TIMEOUT
@@ -352,8 +353,8 @@ def layout_wind():
 @cache.memoize(timeout=TIMEOUT)
 def update_annual_wind_rose(df, meta):
     """Update the contents of tab five. Passing in the info from the sliders and the general info (df, meta)."""
-    df = pd.read_json(df, orient="split")
-    annual = wind_rose(df, "", [1, 12], [1, 24], True)
+    histogram = load_derived(df, wind_rose_histogram)
+    annual = wind_rose(histogram, "", [1, 12], [1, 24], True)
     return dcc.Graph(
         config=generate_chart_name("annual_wind_rose_wind", meta),
         figure=annual,
@@ -372,13 +373,9 @@ def update_annual_wind_rose(df, meta):
 @cache.memoize(timeout=TIMEOUT)
 def update_tab_wind_speed(global_local, df, meta):
     """Update the contents of tab five. Passing in the info from the sliders and the general info (df, meta)."""
-    df = pd.read_json(df, orient="split")
-
-    speed = heatmap(df, "wind_speed", global_local)
-
     return dcc.Graph(
         config=generate_chart_name("wind_speed_wind", meta),
-        figure=speed,
+        figure=load_figure(df, heatmap, "wind_speed", global_local),
     )
 
 
@@ -394,11 +391,9 @@ def update_tab_wind_speed(global_local, df, meta):
 @cache.memoize(timeout=TIMEOUT)
 def update_tab_wind_direction(global_local, df, meta):
     """Update the contents of tab five. Passing in the info from the sliders and the general info (df, meta)."""
-    df = pd.read_json(df, orient="split")
-    direction = heatmap(df, "wind_dir", global_local)
     return dcc.Graph(
         config=generate_chart_name("wind_direction_wind", meta),
-        figure=direction,
+        figure=load_figure(df, heatmap, "wind_dir", global_local),
     )
 
 
@@ -417,22 +412,16 @@ def update_tab_wind_direction(global_local, df, meta):
 @cache.memoize(timeout=TIMEOUT)
 def update_custom_wind_rose(start_month, start_hour, end_month, end_hour, df, meta):
     """Update the contents of tab five. Passing in the info from the sliders and the general info (df, meta)."""
-    df = pd.read_json(df, orient="split")
+    histogram = load_derived(df, wind_rose_histogram)
     start_hour = int(start_hour)
     end_hour = int(end_hour)
     start_month = int(start_month)
     end_month = int(end_month)
 
     # Wind Rose Graphs
-    if start_month <= end_month:
-        df = df.loc[(df["month"] >= start_month) & (df["month"] <= end_month)]
-    else:
-        df = df.loc[(df["month"] <= end_month) | (df["month"] >= start_month)]
-    if start_hour <= end_hour:
-        df = df.loc[(df["hour"] >= start_hour) & (df["hour"] <= end_hour)]
-    else:
-        df = df.loc[(df["hour"] <= end_hour) | (df["hour"] >= start_hour)]
-    custom = wind_rose(df, "", [start_month, end_month], [start_hour, end_hour], True)
+    custom = wind_rose(
+        histogram, "", [start_month, end_month], [start_hour, end_hour], True
+    )
 
     return dcc.Graph(
         config=generate_chart_name("custom_wind_rose_wind", meta),
@@ -457,7 +446,8 @@ def update_custom_wind_rose(start_month, start_hour, end_month, end_hour, df, me
 )
 @cache.memoize(timeout=TIMEOUT)
 def update_seasonal_graphs(df, meta):
-    df = pd.read_json(df, orient="split")
+    histogram = load_derived(df, wind_rose_histogram)
+    df = load_dataset(df)
 
     hours = [1, 24]
     winter_months = [12, 2]
@@ -466,10 +456,10 @@ def update_seasonal_graphs(df, meta):
     fall_months = [9, 12]
 
     # Wind Rose Graphs
-    winter = wind_rose(df, "", winter_months, hours, False)
-    spring = wind_rose(df, "", spring_months, hours, True)
-    summer = wind_rose(df, "", summer_months, hours, False)
-    fall = wind_rose(df, "", fall_months, hours, False)
+    winter = wind_rose(histogram, "", winter_months, hours, False)
+    spring = wind_rose(histogram, "", spring_months, hours, True)
+    summer = wind_rose(histogram, "", summer_months, hours, False)
+    fall = wind_rose(histogram, "", fall_months, hours, False)
 
     # Text
     winter_df = df.loc[
@@ -571,7 +561,8 @@ def update_seasonal_graphs(df, meta):
 @cache.memoize(timeout=TIMEOUT)
 def update_daily_graphs(df, meta):
     """Update the contents of tab five. Passing in the info from the sliders and the general info (df, meta)."""
-    df = pd.read_json(df, orient="split")
+    histogram = load_derived(df, wind_rose_histogram)
+    df = load_dataset(df)
 
     months = [1, 12]
     morning_times = [6, 13]
@@ -579,9 +570,9 @@ def update_daily_graphs(df, meta):
     night_times = [22, 5]
 
     # Wind Rose Graphs
-    morning = wind_rose(df, "", months, morning_times, False)
-    noon = wind_rose(df, "", months, noon_times, False)
-    night = wind_rose(df, "", months, night_times, True)
+    morning = wind_rose(histogram, "", months, morning_times, False)
+    noon = wind_rose(histogram, "", months, noon_times, False)
+    night = wind_rose(histogram, "", months, night_times, True)
 
     # Text
     query_calm_wind = "wind_speed == 0"
@@ -639,3 +630,7 @@ def update_daily_graphs(df, meta):
         noon_text,
         night_text,
     )
+
+
+default_figure(heatmap, "wind_speed", "local")
+default_figure(heatmap, "wind_dir", "local")
@@ -4,10 +4,9 @@ import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from pythermalcomfort.models import adaptive_ashrae
-from pythermalcomfort.utilities import running_mean_outdoor_temperature
 
 from my_project.global_scheme import mapping_dictionary
+from my_project.utils import monthly_range_counts
 
 from .global_scheme import month_lst, template, tight_margins
 
@@ -83,44 +82,33 @@ def violin(df, var, global_local):
 
 
 # YEARLY PROFILE TEMPLATE
-def get_ashrae(df):
-    """calculate the ashrae for the yearly DBT. Helper function for yearly_profile"""
-    dbt_day_ave = df.groupby(["DOY"])["DBT"].mean().reset_index()
-    dbt_day_ave = dbt_day_ave["DBT"].tolist()
-    n = 7
-    cmf55 = []
-    lo80 = []
-    hi80 = []
-    lo90 = []
-    hi90 = []
-    for i in range(len(dbt_day_ave)):
-        if i < n:
-            last_days = dbt_day_ave[-n + i :] + dbt_day_ave[0:i]
-        else:
-            last_days = dbt_day_ave[i - n : i]
-        last_days.reverse()
-        last_days = [10 if x <= 10 else x for x in last_days]
-        last_days = [32 if x >= 32 else x for x in last_days]
-        rmt = running_mean_outdoor_temperature(last_days, alpha=0.9)
-        if dbt_day_ave[i] >= 40:
-            dbt_day_ave[i] = 40
-        elif dbt_day_ave[i] <= 10:
-            dbt_day_ave[i] = 10
-        r = adaptive_ashrae(
-            tdb=dbt_day_ave[i], tr=dbt_day_ave[i], t_running_mean=rmt, v=0.5
-        )
-        cmf55.append(r["tmp_cmf"])
-        lo80.append(r["tmp_cmf_80_low"])
-        hi80.append(r["tmp_cmf_80_up"])
-        lo90.append(r["tmp_cmf_90_low"])
-        hi90.append(r["tmp_cmf_90_up"])
-    return lo80, hi80, lo90, hi90
+def get_ashrae(df, alpha=0.9, n=7):
+    """calculate the ashrae for the yearly DBT. Helper function for yearly_profile
+
+    Return the lower and upper 80% and 90% acceptability limits of each day.
+    The running mean temperature of a day weights the n previous days, taken
+    from the end of the year for the first days, with alpha ** (days ago - 1).
+    """
+    dbt_day_ave = df.groupby(["DOY"])["DBT"].mean().to_numpy()
+    last_days = np.clip(dbt_day_ave, 10, 32)
+    weights = alpha ** np.arange(n)
+    # the n days before each day are the n values before it in padded
+    padded = np.concatenate([last_days[-n:], last_days])
+    rmt = np.convolve(padded, weights, mode="valid")[:-1] / weights.sum()
+    rmt = np.round(rmt, 1)
+
+    # same limits as pythermalcomfort adaptive_ashrae with v=0.5 m/s
+    t_cmf = 0.31 * rmt + 17.8
+    return t_cmf - 3.5, t_cmf + 3.5, t_cmf - 2.5, t_cmf + 2.5
 
 
 # @code_timer
-def yearly_profile(df, var, global_local):
-    """Return yearly profile figure based on the 'var' col."""
-    lo80, hi80, lo90, hi90 = get_ashrae(df)
+def yearly_profile(df, var, global_local, ashrae=None):
+    """Return yearly profile figure based on the 'var' col.
+
+    The adaptive comfort band drawn for DBT is ashrae, the output of get_ashrae,
+    computed from df if not given.
+    """
     var_unit = mapping_dictionary[var]["unit"]
     var_range = mapping_dictionary[var]["range"]
     var_name = mapping_dictionary[var]["name"]
@@ -180,6 +168,10 @@ def yearly_profile(df, var, global_local):
     )
 
     if var == "DBT":
+        if ashrae is None:
+            ashrae = get_ashrae(df)
+        lo80, hi80, lo90, hi90 = ashrae
+
         # plot ashrae adaptive comfort limits (80%)
         lo80_df = pd.DataFrame({"lo80": lo80})
         hi80_df = pd.DataFrame({"hi80": hi80})
@@ -410,63 +402,90 @@ def speed_labels(bins, units):
     return labels
 
 
-def wind_rose(df, title, month, hour, labels):
-    """Return the wind rose figure.
+wind_speed_bins = [-1, 0.5, 1.5, 3.3, 5.5, 7.9, 10.7, 13.8, 17.1, 20.7, np.inf]
+wind_dir_bins = np.arange(-22.5 / 2, 370, 22.5)
+
+
+def wind_rose_histogram(df):
+    """Return the hourly wind observations counted by month, hour, direction and speed.
+
+    The "counts" array has shape (12 months, 24 hours, 16 directions, 10 speed
+    bins), "total" and "calm" count for each month and hour all the observations
+    and those with no wind. Any wind rose is then a sum over a slice of these.
+    """
+    n_dir = len(wind_dir_bins) - 1
+    n_spd = len(wind_speed_bins) - 1
+    month = df["month"].to_numpy(dtype=int) - 1
+    hour = df["hour"].to_numpy(dtype=int) - 1
+    speed = df["wind_speed"].to_numpy(dtype=float)
+    # same intervals as pd.cut, closed on the right for the speed and on the
+    # left for the direction
+    spd_bin = np.searchsorted(wind_speed_bins, speed, side="left") - 1
+    dir_bin = (
+        np.searchsorted(wind_dir_bins, df["wind_dir"].to_numpy(dtype=float), "right")
+        - 1
+    )
+
+    in_year = (month >= 0) & (month < 12) & (hour >= 0) & (hour < 24)
+    month_hour = month[in_year] * 24 + hour[in_year]
+    total = np.bincount(month_hour, minlength=12 * 24)
+    calm = np.bincount(month_hour[speed[in_year] == 0], minlength=12 * 24)
+
+    binned = in_year & (spd_bin >= 0) & (spd_bin < n_spd)
+    binned &= (dir_bin >= 0) & (dir_bin < n_dir)
+    cell = ((month * 24 + hour) * n_dir + dir_bin) * n_spd + spd_bin
+    counts = np.bincount(cell[binned], minlength=12 * 24 * n_dir * n_spd)
+
+    return {
+        "counts": counts.reshape(12, 24, n_dir, n_spd),
+        "total": total.reshape(12, 24),
+        "calm": calm.reshape(12, 24),
+    }
+
+
+def _window_mask(values, start, end):
+    """Return the mask of the values in [start, end], wrapping if start > end."""
+    if start <= end:
+        return (values >= start) & (values <= end)
+    return (values <= end) | (values >= start)
+
+
+def wind_rose(histogram, title, month, hour, labels):
+    """Return the wind rose figure from the output of wind_rose_histogram.
 
     Based on:  https://gist.github.com/phobson/41b41bdd157a2bcf6e14
     """
-    start_month = month[0]
-    end_month = month[1]
-    start_hour = hour[0]
-    end_hour = hour[1]
-    if start_month <= end_month:
-        df = df.loc[(df["month"] >= start_month) & (df["month"] <= end_month)]
-    else:
-        df = df.loc[(df["month"] <= end_month) | (df["month"] >= start_month)]
-    if start_hour <= end_hour:
-        df = df.loc[(df["hour"] >= start_hour) & (df["hour"] <= end_hour)]
-    else:
-        df = df.loc[(df["hour"] <= end_hour) | (df["hour"] >= start_hour)]
+    months = _window_mask(np.arange(1, 13), month[0], month[1])
+    hours = _window_mask(np.arange(1, 25), hour[0], hour[1])
+    window = np.ix_(months, hours)
 
     spd_colors = mapping_dictionary["wind_speed"]["color"]
-    spd_bins = [-1, 0.5, 1.5, 3.3, 5.5, 7.9, 10.7, 13.8, 17.1, 20.7, np.inf]
-    spd_labels = speed_labels(spd_bins, units="m/s")
-    dir_bins = np.arange(-22.5 / 2, 370, 22.5)
-    dir_labels = (dir_bins[:-1] + dir_bins[1:]) / 2
-    total_count = df.shape[0]
-    calm_count = df.query("wind_speed == 0").shape[0]
-    rose = (
-        df.assign(
-            WindSpd_bins=lambda df: pd.cut(
-                df["wind_speed"], bins=spd_bins, labels=spd_labels, right=True
-            )
-        )
-        .assign(
-            WindDir_bins=lambda df: pd.cut(
-                df["wind_dir"], bins=dir_bins, labels=dir_labels, right=False
-            )
-        )
-        .replace({"WindDir_bins": {360: 0}})
-        .groupby(by=["WindSpd_bins", "WindDir_bins"])
-        .size()
-        .unstack(level="WindSpd_bins")
-        .fillna(0)
-        .assign(calm=lambda df: calm_count / df.shape[0])
-        .sort_index(axis=1)
-        .applymap(lambda x: x / total_count * 100)
+    spd_labels = speed_labels(wind_speed_bins, units="m/s")
+    dir_labels = (wind_dir_bins[:-1] + wind_dir_bins[1:]) / 2
+    total_count = histogram["total"][window].sum()
+    calm_count = histogram["calm"][window].sum()
+    rose = pd.DataFrame(
+        histogram["counts"][window].sum(axis=(0, 1)),
+        index=dir_labels,
+        columns=spd_labels,
+        dtype=float,
     )
+    # the calm speed bin shows the hours with no wind spread over all directions
+    rose["calm"] = calm_count / rose.shape[0]
+    rose = rose / total_count * 100
+
     fig = go.Figure()
     for i, col in enumerate(rose.columns):
         fig.add_trace(
             go.Barpolar(
                 r=rose[col],
-                theta=rose.index.categories,
+                theta=rose.index,
                 name=col,
                 marker_color=spd_colors[i],
                 hovertemplate="frequency: %{r:.2f}%"
                 + "<br>"
                 + "direction: %{theta:.2f}"
-                + "\u00B0 deg"
+                + "\u00b0 deg"
                 + "<br>",
             )
         )
@@ -531,29 +550,15 @@ def barchart(df, var, time_filter_info, data_filter_info, normalize):
     color_above = var_color[-1]
     color_in = var_color[len(var_color) // 2]
 
-    new_df = df.copy()
-    month_in = []
-    month_below = []
-    month_above = []
-
-    min_val = str(min_val)
-    max_val = str(max_val)
-
     if len(time_filter_info) == 1:
         filter_var = str(var)
 
-    for i in range(1, 13):
-        query = (
-            f"month=={str(i)} and ({filter_var}>={min_val} and {filter_var}<={max_val})"
-        )
-        a = new_df.query(query)["DOY"].count()
-        month_in.append(a)
-        query = f"month=={str(i)} and ({filter_var}<{min_val})"
-        b = new_df.query(query)["DOY"].count()
-        month_below.append(b)
-        query = f"month=={str(i)} and {filter_var}>{max_val}"
-        c = new_df.query(query)["DOY"].count()
-        month_above.append(c)
+    month_below, month_in, month_above = monthly_range_counts(
+        df, filter_var, float(min_val), float(max_val)
+    )
+
+    min_val = str(min_val)
+    max_val = str(max_val)
 
     go.Figure()
     trace1 = go.Bar(
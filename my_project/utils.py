@@ -1,13 +1,28 @@
 import functools
+import os
+import threading
 import time
 from my_project.global_scheme import fig_config, mapping_dictionary
-import pandas as pd
-import json
-from pandas import json_normalize
+import numpy as np
 from dash import html, dash_table
 import dash_bootstrap_components as dbc
-import plotly.express as px
+import plotly.graph_objects as go
 import copy
+from my_project.station_catalog import (
+    CLUSTER_CELL_DEG,
+    GRID_CELL_DEG,
+    inside_bounds,
+    load_station_catalog,
+    source_energy_plus,
+    source_one_building,
+    station_clusters,
+    stations_in_bounds,
+)
+
+# zoom of the station map when the Select tab is opened
+STATION_MAP_ZOOM = 2
+# from this zoom level the stations in the map are no longer clustered
+STATIONS_MIN_ZOOM = 5
 
 
 def code_timer(func):
@@ -25,6 +40,50 @@ def code_timer(func):
     return wrapper_timer
 
 
+def write_atomically(path, write):
+    """Call write with a temporary file name, then move the file to path.
+
+    Readers in other threads or workers never see a partially written file.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def touch_file(path):
+    """Mark a cached file as recently used."""
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        pass
+
+
+def evict_least_recently_used(directory, max_size_mb):
+    """Delete the least recently used files above the directory size limit.
+
+    Return the number of files deleted.
+    """
+    files = []
+    for entry in os.scandir(directory):
+        if entry.is_file() and not entry.name.endswith(".tmp"):
+            stat = entry.stat()
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total_size = sum(size for _, size, _ in files)
+    deleted = 0
+    for _, size, path in sorted(files):
+        if total_size <= max_size_mb * 1024**2:
+            break
+        try:
+            os.remove(path)
+            deleted += 1
+        except FileNotFoundError:
+            pass
+        total_size -= size
+    return deleted
+
+
 def generate_chart_name(tab_name, meta=None):
     figure_config = copy.deepcopy(fig_config)
     if meta:
@@ -36,43 +95,107 @@ def generate_chart_name(tab_name, meta=None):
     return figure_config
 
 
-def plot_location_epw_files():
-    with open("./assets/data/epw_location.json", encoding="utf8") as data_file:
-        data = json.load(data_file)
+def map_view(relayout_data):
+    """Return the bounds (west, south, east, north) and zoom of the map view.
 
-    df = json_normalize(data["features"])
-    df[["lon", "lat"]] = pd.DataFrame(df["geometry.coordinates"].tolist())
-    df["lat"] += 0.005
-    df["lat"] += 0.005
-    df = df.rename(columns={"properties.epw": "Source"})
+    relayout_data is the relayoutData of a scattermapbox figure, None is
+    returned if it does not describe the view after a pan or a zoom. The
+    bounds are widened to the cells of the clusters at the zoom, at least
+    GRID_CELL_DEG, and the zoom is rounded down, so that close views share
+    the same map of the stations.
+    """
+    try:
+        corners = relayout_data["mapbox._derived"]["coordinates"]
+        zoom = int(relayout_data["mapbox.zoom"])
+    except (KeyError, TypeError):
+        return None
+    lons, lats = zip(*corners)
+    cell = max(CLUSTER_CELL_DEG / 2 ** max(zoom, 0), GRID_CELL_DEG)
+    return (
+        np.floor(min(lons) / cell) * cell,
+        max(np.floor(min(lats) / cell) * cell, -90),
+        np.ceil(max(lons) / cell) * cell,
+        min(np.ceil(max(lats) / cell) * cell, 90),
+        zoom,
+    )
 
-    df_one_building = pd.read_csv("./assets/data/one_building.csv")
 
-    fig2 = px.scatter_mapbox(
-        df.head(2585),
-        lat="lat",
-        lon="lon",
-        hover_name="properties.title",
-        color_discrete_sequence=["#3a0ca3"],
-        hover_data=["Source"],
-        zoom=2,
-        height=500,
+def _stations_trace(stations, color):
+    return go.Scattermapbox(
+        lat=stations["lat"],
+        lon=stations["lon"],
+        mode="markers",
+        marker={"color": color},
+        hovertext=stations["name"],
+        customdata=stations[["url", "source"]],
+        hovertemplate="<b>%{hovertext}</b><br><br>lat=%{lat}<br>lon=%{lon}"
+        "<br>Source=%{customdata[1]}<extra></extra>",
+        showlegend=False,
     )
-    fig = px.scatter_mapbox(
-        df_one_building,
-        lat="lat",
-        lon="lon",
-        hover_name="name",
-        color_discrete_sequence=["#4895ef"],
-        hover_data=["Source"],
-        zoom=2,
+
+
+@functools.lru_cache(maxsize=64)
+def plot_location_epw_files(
+    west=-180, south=-90, east=180, north=90, zoom=STATION_MAP_ZOOM
+):
+    """Return the map of the weather stations within the bounds, in degrees.
+
+    Below STATIONS_MIN_ZOOM the stations close to each other are shown as a
+    single cluster, which has no customdata, the url of each station is in
+    customdata. The figure is returned already converted to a dict, it is
+    shared by all the requests and must not be modified.
+    """
+    catalog = load_station_catalog()
+    if zoom >= STATIONS_MIN_ZOOM:
+        stations = stations_in_bounds(west, south, east, north)
+        clusters = None
+    else:
+        clusters = station_clusters(int(zoom))
+        clusters = clusters.loc[inside_bounds(clusters, west, south, east, north)]
+        stations = catalog.iloc[clusters.loc[clusters["count"] == 1, "position"]]
+        clusters = clusters.loc[clusters["count"] > 1]
+
+    energy_plus = stations.loc[stations["source"] == source_energy_plus]
+    # the EnergyPlus stations would hide the Climate.OneBuilding ones
+    energy_plus = energy_plus.assign(lat=energy_plus["lat"] + 0.01)
+    data = [
+        _stations_trace(
+            stations.loc[stations["source"] == source_one_building], "#4895ef"
+        ),
+        _stations_trace(energy_plus, "#3a0ca3"),
+    ]
+    if clusters is not None:
+        data.append(
+            go.Scattermapbox(
+                lat=clusters["lat"],
+                lon=clusters["lon"],
+                mode="markers",
+                marker={
+                    "color": "#4895ef",
+                    "opacity": 0.7,
+                    "size": 8 + 3 * np.log2(clusters["count"]),
+                },
+                hovertext=clusters["count"],
+                hovertemplate="<b>%{hovertext} stations</b><br>"
+                "Zoom in to select one<extra></extra>",
+                showlegend=False,
+            )
+        )
+
+    fig = go.Figure(data)
+    fig.update_layout(
+        mapbox={
+            "style": "carto-positron",
+            "center": {"lat": catalog["lat"].mean(), "lon": catalog["lon"].mean()},
+            "zoom": STATION_MAP_ZOOM,
+        },
         height=500,
+        margin={"r": 0, "t": 0, "l": 0, "b": 0},
+        # keep the view of the user when the stations in view are updated
+        uirevision="station-map",
     )
-    fig.add_trace(fig2.data[0])
-    fig.update_layout(mapbox_style="carto-positron")
-    fig.update_layout(margin={"r": 0, "t": 0, "l": 0, "b": 0})
 
-    return fig
+    return fig.to_dict()
 
 
 def title_with_tooltip(text, tooltip_text, id_button):
@@ -149,3 +272,33 @@ def summary_table_tmp_rh_tab(df, value):
         ],
         style_as_list_view=True,
     )
+
+
+def monthly_range_counts(df, var, min_val, max_val):
+    """Return the hours of each month with var below, in and above the range.
+
+    The three arrays of 12 counts are computed in one pass, missing values are
+    not counted.
+    """
+    month = df["month"].to_numpy(dtype=int) - 1
+    values = df[var].to_numpy(dtype=float)
+    masks = (
+        values < min_val,
+        (values >= min_val) & (values <= max_val),
+        values > max_val,
+    )
+    return tuple(np.bincount(month[mask], minlength=12) for mask in masks)
+
+
+def monthly_degree_days(df, hdd_setpoint, cdd_setpoint):
+    """Return the heating and cooling degree days of each month.
+
+    Heating degree days are negative, both are truncated to integers.
+    """
+    month = df["month"].to_numpy(dtype=int) - 1
+    dbt = df["DBT"].to_numpy(dtype=float)
+    heating = dbt <= hdd_setpoint
+    cooling = dbt >= cdd_setpoint
+    hdd = np.bincount(month[heating], weights=dbt[heating] - hdd_setpoint, minlength=12)
+    cdd = np.bincount(month[cooling], weights=dbt[cooling] - cdd_setpoint, minlength=12)
+    return (hdd / 24).astype(int).tolist(), (cdd / 24).astype(int).tolist()
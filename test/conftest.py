@@ -0,0 +1,70 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+# the tests import the modules of my_project by their name, as test_utils has
+# always done, alias them to the modules the app imports so that patching one
+# in a test also patches the app
+for module in [
+    "comfort",
+    "dataset_registry",
+    "download_cache",
+    "epw_jobs",
+    "epw_reader",
+    "extract_df",
+    "figure_cache",
+    "import_one_building_files",
+    "koppen_geiger",
+    "psychro",
+    "shared_cache",
+    "solar_position",
+    "station_catalog",
+    "template_graphs",
+    "utils",
+]:
+    sys.modules[module] = importlib.import_module(f"my_project.{module}")
+
+import solar_position  # noqa: E402
+from extract_df import create_df  # noqa: E402
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+EPW_FILE = "ITA_ER_Bologna-Marconi.AP.161400_TMYx.2004-2018.epw"
+
+
+@pytest.fixture(autouse=True, scope="session")
+def solar_positions_dir(tmp_path_factory):
+    """Keep the solar positions computed by create_df out of cache-directory."""
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(
+            solar_position,
+            "SOLAR_POSITIONS_DIR",
+            str(tmp_path_factory.mktemp("solar_positions")),
+        )
+        yield
+
+
+@pytest.fixture
+def repository_root(monkeypatch):
+    """Run the test from the root of the repository, where the assets are."""
+    monkeypatch.chdir(os.path.dirname(TEST_DIR))
+
+
+@pytest.fixture
+def epw_text():
+    """The text of the Bologna EPW file."""
+    with open(os.path.join(TEST_DIR, EPW_FILE)) as f:
+        return f.read()
+
+
+@pytest.fixture
+def epw_lines(epw_text):
+    return epw_text.split("\n")
+
+
+@pytest.fixture
+def epw_df(epw_lines):
+    """The Bologna EPW file processed by create_df."""
+    df, _ = create_df(epw_lines, EPW_FILE)
+    return df
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from pythermalcomfort.models import solar_gain, utci
+
+from comfort import solar_gain_array, utci_array
+
+
+def test_utci_array():
+    rng = np.random.default_rng(42)
+    tdb = rng.uniform(-50, 50, 2000)
+    tr = tdb + rng.uniform(-30, 70, 2000)
+    v = rng.uniform(0.5, 17, 2000)
+    rh = rng.uniform(0, 100, 2000)
+
+    expected = np.vectorize(utci)(tdb, tr, v, rh)
+
+    np.testing.assert_allclose(utci_array(tdb, tr, v, rh), expected, atol=0.1)
+    assert utci_array(25, 25, 1.0, 50) == 24.6
+
+
+def test_utci_array_outside_limits():
+    with pytest.raises(ValueError):
+        utci_array([25, 25], [25, 25], [1.0, 20], [50, 50])
+
+
+@pytest.mark.parametrize("posture", ["standing", "seated", "supine"])
+def test_solar_gain_array(posture):
+    rng = np.random.default_rng(42)
+    sol_altitude = rng.uniform(0, 90, 500)
+    sharp = rng.uniform(0, 180, 500)
+    sol_radiation_dir = rng.uniform(0, 1000, 500)
+
+    expected = np.vectorize(solar_gain)(
+        sol_altitude, sharp, sol_radiation_dir, 0.8, 0.9, 0.7, 0.6, posture, 0.5
+    )
+    result = solar_gain_array(
+        sol_altitude, sharp, sol_radiation_dir, 0.8, 0.9, 0.7, 0.6, posture, 0.5
+    )
+
+    np.testing.assert_allclose(result["erf"], [r["erf"] for r in expected])
+    np.testing.assert_allclose(result["delta_mrt"], [r["delta_mrt"] for r in expected])
@@ -0,0 +1,76 @@
+import os
+from collections import OrderedDict
+
+import pandas as pd
+import pytest
+from dash.exceptions import PreventUpdate
+
+import dataset_registry
+from dataset_registry import (
+    cache_location,
+    get_cached_location,
+    get_dataset,
+    load_dataset,
+    register_dataset,
+)
+
+
+def test_register_and_get_dataset(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset_registry, "DATASETS_DIR", str(tmp_path))
+    df = pd.DataFrame({"DBT": [1.0, 2.0, 3.0]})
+    key = register_dataset(df)
+    assert key == register_dataset(df.copy())
+    assert os.listdir(tmp_path) == [f"{key}.pkl"]
+    pd.testing.assert_frame_equal(get_dataset(key), df)
+
+    # read back from disk by a worker which does not have it in memory
+    monkeypatch.setattr(dataset_registry, "_datasets", OrderedDict())
+    pd.testing.assert_frame_equal(load_dataset(key), df)
+
+
+def test_register_dataset_on_disk_only(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset_registry, "DATASETS_DIR", str(tmp_path))
+    monkeypatch.setattr(dataset_registry, "_datasets", OrderedDict())
+    df = pd.DataFrame({"DBT": [1.0, 2.0, 3.0]})
+    key = register_dataset(df, keep_in_memory=False)
+    assert key not in dataset_registry._datasets
+    pd.testing.assert_frame_equal(get_dataset(key), df)
+
+
+def test_get_dataset_returns_a_copy(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset_registry, "DATASETS_DIR", str(tmp_path))
+    key = register_dataset(pd.DataFrame({"DBT": [1.0, 2.0]}))
+
+    # the callbacks filter the dataframes they get in place
+    df = get_dataset(key)
+    df[df["DBT"] > 1] = None
+    assert get_dataset(key)["DBT"].tolist() == [1.0, 2.0]
+
+
+def test_unknown_keys(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset_registry, "DATASETS_DIR", str(tmp_path))
+    for key in [None, 1, "", "../../etc/passwd", "A" * 40, "0" * 39, "0" * 40]:
+        assert get_dataset(key) is None
+        with pytest.raises(PreventUpdate):
+            load_dataset(key)
+
+
+def test_get_cached_location(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset_registry, "DATASETS_DIR", str(tmp_path / "datasets"))
+    monkeypatch.setattr(dataset_registry, "LOCATIONS_DIR", str(tmp_path / "locations"))
+    url = "https://example.com/weather.epw"
+    assert get_cached_location(url) is None
+
+    key = register_dataset(pd.DataFrame({"DBT": [1.0, 2.0]}))
+    cache_location(url, key, {"city": "Bologna"})
+    assert get_cached_location(url) == (key, {"city": "Bologna"})
+
+    # evicted from disk but still in memory, written back for the other workers
+    os.remove(dataset_registry._dataset_path(key))
+    assert get_cached_location(url) == (key, {"city": "Bologna"})
+    assert os.path.isfile(dataset_registry._dataset_path(key))
+
+    # evicted from disk and from memory
+    os.remove(dataset_registry._dataset_path(key))
+    dataset_registry._datasets.pop(key)
+    assert get_cached_location(url) is None
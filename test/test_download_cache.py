@@ -0,0 +1,67 @@
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+import download_cache
+from download_cache import cached_download
+
+
+class EPWHandler(BaseHTTPRequestHandler):
+    content = b"LOCATION,Bologna"
+    etag = '"v1"'
+    status = None
+    requests = []
+
+    def do_GET(self):
+        EPWHandler.requests.append(self.headers.get("If-None-Match"))
+        if self.status is not None:
+            self.send_response(self.status)
+            self.end_headers()
+        elif self.path != "/file.epw":
+            self.send_response(404)
+            self.end_headers()
+        elif self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.end_headers()
+        else:
+            self.send_response(200)
+            self.send_header("ETag", self.etag)
+            self.send_header("Content-Length", str(len(self.content)))
+            self.end_headers()
+            self.wfile.write(self.content)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setattr(download_cache, "DOWNLOADS_DIR", str(tmp_path))
+    EPWHandler.requests = []
+    EPWHandler.status = None
+    httpd = HTTPServer(("127.0.0.1", 0), EPWHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+
+
+def test_cached_download(server, monkeypatch):
+    url = f"{server}/file.epw"
+
+    assert cached_download(url) == b"LOCATION,Bologna"
+    # fresh copy, the server is not contacted
+    assert cached_download(url) == b"LOCATION,Bologna"
+    assert EPWHandler.requests == [None]
+
+    # stale copy, revalidated with the ETag
+    monkeypatch.setattr(download_cache, "DOWNLOAD_MAX_AGE", 0)
+    assert cached_download(url) == b"LOCATION,Bologna"
+    assert EPWHandler.requests == [None, '"v1"']
+
+    assert cached_download(f"{server}/missing.epw") is None
+
+    # the cached copy is served while the server fails
+    EPWHandler.status = 503
+    assert cached_download(url) == b"LOCATION,Bologna"
+    assert cached_download(f"{server}/missing.epw") is None
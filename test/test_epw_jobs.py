@@ -0,0 +1,81 @@
+import os
+import time
+
+import dataset_registry
+import epw_jobs
+from conftest import EPW_FILE
+from dataset_registry import get_dataset
+from epw_jobs import (
+    epw_job_stalled,
+    epw_job_status,
+    process_epw,
+    submit_epw_job,
+)
+
+
+def test_process_epw(epw_text, tmp_path, monkeypatch):
+    monkeypatch.setattr(epw_jobs, "JOBS_DIR", str(tmp_path / "jobs"))
+    monkeypatch.setattr(dataset_registry, "DATASETS_DIR", str(tmp_path / "datasets"))
+    stages = []
+
+    def write_status(job_id, stage, **result):
+        stages.append(stage)
+        write(job_id, stage, **result)
+
+    write = epw_jobs._write_status
+    monkeypatch.setattr(epw_jobs, "_write_status", write_status)
+
+    process_epw("0" * 32, text=epw_text, file_name=EPW_FILE)
+    assert stages == ["parse", "solar", "utci", "psychrometrics", "done"]
+    status = epw_job_status("0" * 32)
+    assert status["location_info"]["city"] == "Bologna Marconi AP"
+    assert len(get_dataset(status["key"])) == 8760
+    assert not epw_job_stalled(status)
+
+    process_epw("1" * 32, text=epw_text[:2000], file_name=EPW_FILE)
+    status = epw_job_status("1" * 32)
+    assert status["stage"] == "done"
+    assert status["error"] == "invalid_format"
+    assert "key" not in status
+
+    # the EPW is valid but its processing fails
+    def create_df(lines, file_name, progress):
+        raise ValueError("outside the range of applicability")
+
+    monkeypatch.setattr(epw_jobs, "create_df", create_df)
+    process_epw("2" * 32, text=epw_text, file_name=EPW_FILE)
+    status = epw_job_status("2" * 32)
+    assert status["error"] == "processing_failed"
+    assert status["detail"] == "outside the range of applicability"
+
+    assert epw_job_status("../" + "0" * 32) is None
+
+
+def test_epw_job_stalled(monkeypatch):
+    status = {"stage": "utci", "updated": time.time()}
+    assert not epw_job_stalled(status)
+    monkeypatch.setattr(epw_jobs.time, "time", lambda: status["updated"] + 3600)
+    assert epw_job_stalled(status)
+    assert not epw_job_stalled({**status, "stage": "done"})
+
+
+def test_submit_epw_job(epw_text, tmp_path, monkeypatch):
+    # the worker processes do not see the patched modules, only the directory
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(epw_jobs, "_pool", None)
+
+    job_id = submit_epw_job(text=epw_text, file_name=EPW_FILE)
+    try:
+        stages = [epw_job_status(job_id)["stage"]]
+        for _ in range(600):
+            if stages[-1] == "done":
+                break
+            time.sleep(0.1)
+            stages.append(epw_job_status(job_id)["stage"])
+    finally:
+        epw_jobs._pool.shutdown()
+
+    assert stages[0] == "queued"
+    assert stages[-1] == "done"
+    assert get_dataset(epw_job_status(job_id)["key"]) is not None
+    assert os.listdir(tmp_path) == ["cache-directory"]
@@ -0,0 +1,45 @@
+import pytest
+
+from epw_reader import EpwFormatError, read_epw_data, read_epw_header
+
+
+def test_read_epw_header(epw_lines):
+    location_info = read_epw_header(epw_lines)
+
+    assert location_info["city"] == "Bologna Marconi AP"
+    assert location_info["lat"] == 44.5308
+    assert location_info["period"] == "2004-2018"
+
+
+def test_read_epw_header_malformed(epw_lines):
+    with pytest.raises(EpwFormatError, match="fewer than 8 lines"):
+        read_epw_header(["LOCATION,Bologna"])
+
+    with pytest.raises(EpwFormatError, match="Malformed EPW header"):
+        read_epw_header(["not an EPW file"] + epw_lines[1:])
+
+
+def test_read_epw_data(epw_lines):
+    df = read_epw_data(epw_lines)
+
+    assert df.shape == (8760, 29)
+    assert df["hour"].dtype == "int16"
+    assert df["DBT"].dtype == "float64"
+    assert df["DBT"].iloc[0] == 7.0
+
+
+def test_read_epw_data_malformed_rows(epw_lines):
+    lines = list(epw_lines)
+    lines[20] = lines[20].replace(",9.0,", ",abc,", 1)
+
+    with pytest.raises(EpwFormatError, match=r"lines \[21\]"):
+        read_epw_data(lines)
+
+    lines = list(epw_lines)
+    lines[30] += ",1"
+
+    with pytest.raises(EpwFormatError, match="line 31"):
+        read_epw_data(lines)
+
+    with pytest.raises(EpwFormatError, match="expected 8760 hourly records"):
+        read_epw_data(epw_lines[:-100])
@@ -0,0 +1,147 @@
+import json
+import threading
+
+import pytest
+
+import dataset_registry
+import figure_cache
+from app import app, cache
+from dataset_registry import register_dataset
+from figure_cache import (
+    default_figure,
+    load_figure,
+    new_session,
+    prerender_figures,
+)
+from shared_cache import SharedFileSystemCache
+from template_graphs import get_ashrae, heatmap, yearly_profile
+
+
+@pytest.fixture
+def df(epw_df, tmp_path, monkeypatch):
+    """The Bologna dataset, cached with its figures in tmp_path only."""
+    monkeypatch.setattr(dataset_registry, "DATASETS_DIR", str(tmp_path / "datasets"))
+    monkeypatch.setattr(figure_cache, "PRERENDERS_DIR", str(tmp_path / "prerenders"))
+    monkeypatch.setitem(
+        app.server.extensions["cache"],
+        cache,
+        SharedFileSystemCache(str(tmp_path / "callbacks")),
+    )
+    return epw_df
+
+
+def test_load_figure(df):
+    key = register_dataset(df)
+
+    calls = []
+
+    def chart(df, var, global_local):
+        calls.append(var)
+        return heatmap(df, var, global_local)
+
+    with app.server.app_context():
+        figure = load_figure(key, chart, "DBT", "global")
+        assert figure == json.loads(heatmap(df, "DBT", "global").to_json())
+
+        # served from the cache, a copy that can be modified
+        figure["layout"]["title"] = "modified"
+        assert load_figure(key, chart, "DBT", "global") != figure
+        assert calls == ["DBT"]
+
+        load_figure(key, chart, "RH", "global")
+        assert calls == ["DBT", "RH"]
+
+
+def test_load_figure_derived(df):
+    key = register_dataset(df)
+    computed = []
+
+    def ashrae(df):
+        computed.append(len(df))
+        return get_ashrae(df)
+
+    with app.server.app_context():
+        figure = load_figure(key, yearly_profile, "DBT", "local", ashrae=ashrae)
+        assert figure == json.loads(yearly_profile(df, "DBT", "local").to_json())
+        load_figure(key, yearly_profile, "DBT", "global", ashrae=ashrae)
+    assert computed == [8760]
+
+
+def test_prerender_figures(df, monkeypatch):
+    monkeypatch.setattr(figure_cache, "default_figures", [])
+    key = register_dataset(df)
+
+    rendering, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow_chart(df, var):
+        calls.append(var)
+        rendering.set()
+        release.wait(5)
+        return heatmap(df, var)
+
+    def chart(df, var):
+        calls.append(var)
+        return heatmap(df, var)
+
+    default_figure(slow_chart, "DBT")
+    default_figure(chart, "RH")
+    default_figure(chart, "RH")
+
+    # the dataset is rendered only once at a time
+    job = prerender_figures(key)
+    assert rendering.wait(5)
+    assert prerender_figures(key) is None
+    release.set()
+    job.result(5)
+    assert calls == ["DBT", "RH"]
+
+    # the figures already rendered are skipped
+    prerender_figures(key).result(5)
+    with app.server.app_context():
+        assert load_figure(key, chart, "RH") == json.loads(heatmap(df, "RH").to_json())
+    assert calls == ["DBT", "RH"]
+
+
+def test_prerender_figures_of_a_session(df, monkeypatch):
+    monkeypatch.setattr(figure_cache, "default_figures", [])
+    key = register_dataset(df)
+    other_key = "0" * 40
+    user, other_user = new_session(), new_session()
+
+    rendering, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow_chart(df, var):
+        calls.append(var)
+        rendering.set()
+        release.wait(5)
+        return heatmap(df, var)
+
+    def chart(df, var):
+        calls.append(var)
+        return heatmap(df, var)
+
+    default_figure(slow_chart, "DBT")
+    default_figure(slow_chart, "RH")
+    default_figure(chart, "WS")
+
+    # loading another location stops after the figure being rendered
+    job = prerender_figures(key, user)
+    assert rendering.wait(5)
+    prerender_figures(other_key, user)
+    release.set()
+    job.result(5)
+    assert calls == ["DBT"]
+
+    # unless another session is waiting for the same dataset, the figures
+    # already rendered are skipped
+    rendering.clear()
+    release.clear()
+    job = prerender_figures(key, user)
+    assert rendering.wait(5)
+    assert prerender_figures(key, other_user) is None
+    prerender_figures(other_key, user)
+    release.set()
+    job.result(5)
+    assert calls == ["DBT", "RH", "WS"]
@@ -0,0 +1,18 @@
+from koppen_geiger import _load_grid, climate_zone, zone_descriptions
+
+
+def test_climate_zone(repository_root):
+    assert climate_zone(44.53, 11.3) == "Cfa"
+    assert climate_zone(1.35, 103.99) == "Af"
+    assert climate_zone(-89, 0) == "EF"
+    assert climate_zone("37.77", "-122.42") == "Csb"
+    # Iles de la Madeleine AP, in a cell of the grid in the sea
+    assert climate_zone(47.4253, -61.7747) == "Dfb"
+    # Pacific Ocean
+    assert climate_zone(0, -150) is None
+
+
+def test_zone_descriptions(repository_root):
+    _, codes = _load_grid()
+
+    assert set(codes[1:]) == set(zone_descriptions)
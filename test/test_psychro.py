@@ -0,0 +1,23 @@
+import numpy as np
+from pythermalcomfort import psychrometrics as psy
+
+from psychro import psy_ta_rh
+
+
+def test_psy_ta_rh():
+    rng = np.random.default_rng(42)
+    tdb = rng.uniform(-50, 50, 1000)
+    rh = rng.uniform(1, 100, 1000)
+
+    expected = np.vectorize(psy.psy_ta_rh)(tdb, rh)
+    result = psy_ta_rh(tdb, rh)
+
+    for key in ["p_sat", "p_vap", "hr", "t_wb", "t_dp", "h"]:
+        np.testing.assert_allclose(result[key], [r[key] for r in expected])
+
+
+def test_psy_ta_rh_broadcast():
+    result = psy_ta_rh(np.arange(-10, 40)[None, :], np.arange(10, 110, 10)[:, None])
+
+    assert result["hr"].shape == (10, 50)
+    assert result["hr"][0, 35] == psy.psy_ta_rh(25, 10)["hr"]
@@ -0,0 +1,81 @@
+import os
+
+from flask import Flask
+
+import shared_cache
+from shared_cache import NamespacedCache, SharedFileSystemCache, remove_other_versions
+
+
+def test_shared_between_workers(tmp_path):
+    worker_1 = SharedFileSystemCache(str(tmp_path))
+    worker_2 = SharedFileSystemCache(str(tmp_path))
+
+    worker_1.set("figure", {"data": [1, 2, 3]})
+    assert worker_2.get("figure") == {"data": [1, 2, 3]}
+    assert worker_2.get("missing") is None
+    assert not worker_2.add("figure", {})
+    assert worker_2.delete("figure")
+    assert not worker_1.has("figure")
+
+    stats = worker_2.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["entries"] == 0
+
+
+def test_expired_and_evicted(tmp_path, monkeypatch):
+    cache = SharedFileSystemCache(str(tmp_path), max_size_mb=0.001, evict_every=1)
+    now = 1000.0
+    monkeypatch.setattr(shared_cache.time, "time", lambda: now)
+
+    cache.set("short", "value", timeout=10)
+    cache.set("forever", "value", timeout=0)
+    now += 11
+    assert cache.get("short") is None
+    assert cache.get("forever") == "value"
+
+    for i in range(10):
+        cache.set(f"large {i}", os.urandom(500))
+    stats = cache.stats()
+    assert stats["expired"] == 1
+    assert stats["evictions"] > 0
+    assert stats["size_mb"] <= 0.001
+
+
+def test_namespace_timeouts(tmp_path):
+    app = Flask(__name__)
+    cache = NamespacedCache(
+        app,
+        config={
+            "CACHE_TYPE": "my_project.shared_cache.SharedFileSystemCache",
+            "CACHE_DIR": str(tmp_path),
+            "CACHE_NAMESPACE_TIMEOUTS": {
+                "figure": 60,
+                "figure:wind": 3600,
+                "test_shared_cache": 120,
+            },
+        },
+    )
+
+    @cache.memoize(timeout=10)
+    def chart(x):
+        return x
+
+    assert cache.namespace_timeout("figure:wind:rose") == 3600
+    assert cache.namespace_timeout("figure:sun") == 60
+    assert cache.namespace_timeout("dataset", 5) == 5
+    # memoized functions take the timeout of their module
+    assert chart.cache_timeout == 120
+    with app.app_context():
+        cache.set("figure:wind:rose", "rose")
+        assert cache.get("figure:wind:rose") == "rose"
+
+
+def test_versions(tmp_path):
+    version_1 = SharedFileSystemCache(str(tmp_path / "v1"), key_prefix="v1:")
+    version_1.set("figure", "rendered by version 1")
+    version_2 = SharedFileSystemCache(str(tmp_path / "v1"), key_prefix="v2:")
+    assert version_2.get("figure") is None
+
+    (tmp_path / "unversioned.pkl").write_bytes(b"")
+    remove_other_versions(str(tmp_path / "v2"))
+    assert os.listdir(tmp_path) == []
+    remove_other_versions(str(tmp_path / "missing" / "v2"))
@@ -0,0 +1,36 @@
+import os
+from collections import OrderedDict
+
+import pandas as pd
+from pvlib import solarposition
+
+import solar_position
+from solar_position import daily_solar_position, hourly_solar_position
+
+
+def test_hourly_solar_position(tmp_path, monkeypatch):
+    monkeypatch.setattr(solar_position, "SOLAR_POSITIONS_DIR", str(tmp_path))
+    monkeypatch.setattr(solar_position, "_positions", OrderedDict())
+
+    result = hourly_solar_position(44.5308, 11.2969, 1)
+    assert result.shape[0] == 8760
+    assert result.index[0] == pd.Timestamp("2019-01-01 00:00", tz="UTC")
+    expected = solarposition.get_solarposition(result.index, 44.53, 11.3)
+    pd.testing.assert_frame_equal(result, expected)
+
+    # a station whose coordinates differ only after the rounding
+    assert hourly_solar_position(44.531, 11.297, 1.0).equals(result)
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_daily_solar_position_from_disk(tmp_path, monkeypatch):
+    monkeypatch.setattr(solar_position, "SOLAR_POSITIONS_DIR", str(tmp_path))
+
+    result = daily_solar_position("2019-06-21", -33.87, 151.21, 10)
+    assert result.shape[0] == 24 * 12 + 1
+
+    # forget the positions kept in memory
+    monkeypatch.setattr(solar_position, "_positions", OrderedDict())
+    pd.testing.assert_frame_equal(
+        daily_solar_position("2019-06-21", -33.87, 151.21, 10), result
+    )
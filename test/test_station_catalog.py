@@ -0,0 +1,118 @@
+import numpy as np
+import pytest
+
+from import_one_building_files import import_kml_files, merge_stations
+from station_catalog import (
+    earth_radius_km,
+    load_station_catalog,
+    nearest_stations,
+    search_stations,
+    source_one_building,
+    station_clusters,
+    stations_in_bounds,
+)
+
+
+def test_load_station_catalog(repository_root):
+    catalog = load_station_catalog()
+
+    assert not catalog.duplicated(subset=["source", "id"]).any()
+    assert catalog["lat"].between(-90, 90).all()
+    assert catalog["lon"].between(-180, 180).all()
+    assert set(catalog["source"].cat.categories) == {
+        "EnergyPlus",
+        "Climate.OneBuilding.Org",
+    }
+    assert catalog["url"].str.startswith("http").all()
+
+
+def test_import_kml_files(repository_root):
+    stations = import_kml_files("Region7_Antarctica_EPW_Processing_locations")
+    station = stations.iloc[0]
+
+    assert (
+        station["id"] == "ATA_GBR_Vernadsky.Research.Base-Argentine.Islands.889520_TMYx"
+    )
+    assert station["name"] == "Vernadsky Research Base Argentine Islands GBR ATA"
+    assert station["lat"] == -65.25 and station["lon"] == -64.267
+    assert station["source"] == source_one_building
+    assert station["period"] == "1955-1984"
+    assert station["wmo"] == "889520"
+
+
+def test_merge_stations(repository_root):
+    stations = import_kml_files("Region7_Antarctica_EPW_Processing_locations")
+    catalog = stations.iloc[:10]
+    update = stations.iloc[5:].copy()
+    update["period"] = "2004-2018"
+
+    merged = merge_stations(catalog, update)
+
+    assert merged["id"].tolist() == stations["id"].tolist()
+    assert (merged["period"].iloc[5:] == "2004-2018").all()
+    assert merged["period"].iloc[0] == stations["period"].iloc[0]
+
+
+def test_nearest_stations(repository_root):
+    catalog = load_station_catalog()
+    lat, lon = 44.53, 11.3
+    stations = nearest_stations(lat, lon, n=10)
+
+    # haversine distance to all the stations
+    phi, lam = np.radians(catalog["lat"]), np.radians(catalog["lon"])
+    a = (
+        np.sin((phi - np.radians(lat)) / 2) ** 2
+        + np.cos(phi)
+        * np.cos(np.radians(lat))
+        * np.sin((lam - np.radians(lon)) / 2) ** 2
+    )
+    distance = 2 * earth_radius_km * np.arcsin(np.sqrt(a))
+    expected = np.sort(distance)[:10]
+
+    np.testing.assert_allclose(stations["distance"], expected, atol=1e-6)
+    assert stations["name"].tolist() == catalog.loc[stations.index, "name"].tolist()
+    assert len(nearest_stations(lat, lon, n=1)) == 1
+
+
+@pytest.mark.parametrize(
+    "bounds, lon_mask",
+    [
+        ((5, 35, 30, 60), lambda lon: lon.between(5, 30)),
+        ((170, -50, 200, -10), lambda lon: (lon >= 170) | (lon <= -160)),
+        ((-200, -50, -160, -10), lambda lon: (lon >= 160) | (lon <= -160)),
+        ((-400, -90, 400, 90), lambda lon: lon.notna()),
+    ],
+)
+def test_stations_in_bounds(repository_root, bounds, lon_mask):
+    catalog = load_station_catalog()
+    west, south, east, north = bounds
+    expected = catalog.loc[
+        catalog["lat"].between(south, north) & lon_mask(catalog["lon"])
+    ]
+
+    assert len(expected) > 0
+    assert stations_in_bounds(*bounds).index.equals(expected.index)
+
+
+def test_station_clusters(repository_root):
+    catalog = load_station_catalog()
+
+    for zoom in range(5):
+        clusters = station_clusters(zoom)
+        assert clusters["count"].sum() == len(catalog)
+    assert len(station_clusters(2)) < len(catalog) / 10
+
+
+def test_search_stations(repository_root):
+    # whole words first, then the shortest names
+    stations = search_stations("saskatoon intl", n=50)
+    assert len(stations) > 0
+    assert stations["name"].str.startswith("Saskatoon Intl").all()
+
+    # by prefix, WMO number and misspelled
+    assert "Charlottetown AP PE CAN" in search_stations("charlot")["name"].tolist()
+    assert set(search_stations("710560")["wmo"]) == {"710560"}
+    assert "Charlottetown AP PE CAN" in search_stations("charlotetown")["name"].tolist()
+
+    assert search_stations("").empty
+    assert search_stations("zzzzqq").empty
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pythermalcomfort.models import adaptive_ashrae
+from pythermalcomfort.utilities import running_mean_outdoor_temperature
+
+from template_graphs import (
+    get_ashrae,
+    wind_dir_bins,
+    wind_rose,
+    wind_rose_histogram,
+    wind_speed_bins,
+)
+
+
+def test_wind_rose_histogram(epw_df):
+    df = epw_df
+    histogram = wind_rose_histogram(df)
+
+    assert histogram["counts"].shape == (12, 24, 16, 10)
+    assert histogram["total"].sum() == 8760
+    assert histogram["calm"].sum() == (df["wind_speed"] == 0).sum()
+
+    # December to February between 22:00 and 5:00
+    window = df.loc[
+        ((df["month"] >= 12) | (df["month"] <= 2))
+        & ((df["hour"] >= 22) | (df["hour"] <= 5))
+    ]
+    expected = (
+        pd.crosstab(
+            pd.cut(window["wind_dir"], bins=wind_dir_bins, right=False),
+            pd.cut(window["wind_speed"], bins=wind_speed_bins, right=True),
+            dropna=False,
+        )
+        .iloc[:16, :10]
+        .to_numpy()
+    )
+    months = [11, 0, 1]
+    hours = [21, 22, 23, 0, 1, 2, 3, 4]
+    counts = histogram["counts"][np.ix_(months, hours)].sum(axis=(0, 1))
+    np.testing.assert_array_equal(counts, expected)
+
+    fig = wind_rose(histogram, "", [12, 2], [22, 5], True)
+    total = sum(np.sum(trace.r) for trace in fig.data)
+    assert total <= 100
+
+
+def test_get_ashrae(epw_df):
+    df = epw_df
+    lo80, hi80, lo90, hi90 = get_ashrae(df)
+    dbt_day_ave = df.groupby("DOY")["DBT"].mean().clip(10, 32).tolist()
+
+    assert len(lo80) == df["DOY"].nunique()
+    # the first days use the last days of the year
+    for day in [0, 3, 200]:
+        last_days = (dbt_day_ave[-7:] + dbt_day_ave)[day : day + 7][::-1]
+        rmt = running_mean_outdoor_temperature(last_days, alpha=0.9)
+        r = adaptive_ashrae(tdb=25, tr=25, t_running_mean=rmt, v=0.5)
+        assert lo80[day] == pytest.approx(r["tmp_cmf_80_low"])
+        assert hi80[day] == pytest.approx(r["tmp_cmf_80_up"])
+        assert lo90[day] == pytest.approx(r["tmp_cmf_90_low"])
+        assert hi90[day] == pytest.approx(r["tmp_cmf_90_up"])
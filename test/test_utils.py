@@ -1,4 +1,9 @@
-from utils import summary_table_tmp_rh_tab
+from utils import (
+    map_view,
+    monthly_degree_days,
+    monthly_range_counts,
+    summary_table_tmp_rh_tab,
+)
 from extract_df import get_data, create_df
 import pandas as pd
 import os
@@ -28,3 +33,44 @@ def test_summary_table_tmp_rh_tab():
 
     assert data_table.data[0]["month"] == "Jan"
     assert data_table.data[0]["mean"] == 80.34
+
+
+def test_monthly_range_counts():
+    df = import_epw_test()
+    below, in_range, above = monthly_range_counts(df, "DBT", 10, 20)
+
+    january = df.loc[df["month"] == 1, "DBT"]
+    assert below[0] == (january < 10).sum()
+    assert in_range[0] == january.between(10, 20).sum()
+    assert above[0] == (january > 20).sum()
+    assert (below + in_range + above).sum() == df["DBT"].count()
+
+
+def test_monthly_degree_days():
+    df = import_epw_test()
+    hdd, cdd = monthly_degree_days(df, 10, 21)
+
+    january = df.loc[df["month"] == 1, "DBT"]
+    assert hdd[0] == int(january[january <= 10].sub(10).sum() / 24)
+    july = df.loc[df["month"] == 7, "DBT"]
+    assert cdd[6] == int(july[july >= 21].sub(21).sum() / 24)
+    assert all(value <= 0 for value in hdd) and all(value >= 0 for value in cdd)
+
+
+def test_map_view():
+    def relayout_data(west, south, east, north, zoom):
+        corners = [[west, north], [east, north], [east, south], [west, south]]
+        return {"mapbox._derived": {"coordinates": corners}, "mapbox.zoom": zoom}
+
+    assert map_view({"autosize": True}) is None
+    # the views close to each other share the same bounds
+    view = map_view(relayout_data(10.2, 43.7, 12.6, 45.1, 6.3))
+    assert view == (10, 43, 13, 46, 6)
+    assert map_view(relayout_data(10.4, 43.9, 12.1, 45.3, 6.8)) == view
+    assert map_view(relayout_data(-200, -89.5, 200, 89.5, 0.5)) == (
+        -225,
+        -90,
+        225,
+        90,
+        0,
+    )